@@ -0,0 +1,430 @@
+import collections
+import glob
+import gzip
+import hashlib
+import json
+import os
+import shlex
+import tarfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from liveresponse.baseline import delta_status, removed_entry, same_metadata
+from liveresponse.governor import lower_priority
+from liveresponse.output import CHUNK_SIZE, MB, sibling_path
+from liveresponse.walker import walk
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+BLOCK_SIZE = 1024 * 1024
+DEFAULT_LEVEL = 6
+# compression levels each format accepts
+LEVELS = {'gzip': (1, 9), 'zstd': (1, 22)}
+DEFAULT_THREADS = os.cpu_count() or 1
+FORMATS = ('gzip', 'zstd')
+# an interrupted acquisition can be resumed from the last checkpoint
+CHECKPOINT_BYTES = 64 * 1024 * 1024
+CHECKPOINT_INTERVAL = 10.0
+# every archive is accompanied by an NDJSON index of path → metadata + sha256
+FILES_EXTENSION = '.files.ndjson'
+# name infix of acquisitions that only hold what changed since a baseline
+DELTA = '.delta'
+
+
+def clamp_level(fmt, level):
+    # the nearest level the format accepts; the store format takes any
+    low, high = LEVELS.get(fmt, (level, level))
+    return min(max(level, low), high)
+
+
+def _gzip_block(data, level):
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class ArchiveStats:
+    def __init__(self):
+        self.files = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.errors = []
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+        # totals carried over from an interrupted run
+        self.resumed_in = 0
+        # differential acquisitions: entries matching the baseline, entries gone since
+        self.unchanged = 0
+        self.removed = 0
+        # files that shrank or grew while they were read
+        self.changed = 0
+        # entries left out by the walk filter; not part of the checkpoint
+        # state, a resumed walk passes the skipped entries again
+        self.filtered = 0
+
+    def finish(self):
+        self.elapsed = time.monotonic() - self.started
+
+    def rate(self):
+        return (self.bytes_in - self.resumed_in) / self.elapsed / MB if self.elapsed else 0.0
+
+    def state(self):
+        return {'files': self.files, 'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out,
+                'errors': list(self.errors), 'unchanged': self.unchanged, 'removed': self.removed,
+                'changed': self.changed}
+
+    def restore(self, state):
+        self.files = state['files']
+        self.bytes_in = self.resumed_in = state['bytes_in']
+        self.bytes_out = state['bytes_out']
+        self.errors = list(state['errors'])
+        self.unchanged = state['unchanged']
+        self.removed = state['removed']
+        self.changed = state.get('changed', 0)
+
+    def delta_summary(self):
+        if not self.unchanged and not self.removed:
+            return ""
+        return f", {self.unchanged} unchanged and {self.removed} removed since the baseline"
+
+    def changed_summary(self):
+        return f", {self.changed} changed while read" if self.changed else ""
+
+    def filter_summary(self):
+        return f", {self.filtered} filtered out" if self.filtered else ""
+
+    def summary(self):
+        ratio = self.bytes_in / self.bytes_out if self.bytes_out else 0.0
+        return (f"{self.files} files, {self.bytes_in / MB:.1f} MB → {self.bytes_out / MB:.1f} MB "
+                f"(ratio {ratio:.1f}){self.changed_summary()}{self.delta_summary()}{self.filter_summary()} "
+                f"in {self.elapsed:.1f}s, "
+                f"{self.rate():.1f} MB/s")
+
+
+class ParallelGzipWriter:
+    # every block becomes its own gzip member; concatenated members are a
+    # standard gzip stream that gunzip and tar xzf read without changes
+    def __init__(self, writer, stats, level=DEFAULT_LEVEL, threads=DEFAULT_THREADS,
+                 block_size=BLOCK_SIZE, initializer=None, initargs=()):
+        self.writer = writer
+        self.stats = stats
+        self.level = level
+        self.block_size = block_size
+        self.max_pending = max(2, threads * 2)
+        self.pool = ProcessPoolExecutor(max_workers=max(1, threads),
+                                        initializer=initializer, initargs=initargs)
+        self.pending = collections.deque()
+        self.buffer = bytearray()
+        self.position = 0
+
+    def tell(self):
+        return self.position
+
+    def write(self, data):
+        self.stats.bytes_in += len(data)
+        self.position += len(data)
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            self._submit(bytes(self.buffer[:self.block_size]))
+            del self.buffer[:self.block_size]
+        return len(data)
+
+    def _submit(self, block):
+        self.pending.append(self.pool.submit(_gzip_block, block, self.level))
+        while len(self.pending) > self.max_pending:
+            self._drain_one()
+
+    def _drain_one(self):
+        compressed = self.pending.popleft().result()
+        self.writer.write(compressed)
+        self.stats.bytes_out += len(compressed)
+
+    def flush(self):
+        # ends the current gzip member, everything written so far reaches the writer
+        if self.buffer:
+            self._submit(bytes(self.buffer))
+            self.buffer = bytearray()
+        while self.pending:
+            self._drain_one()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.pool.shutdown()
+
+
+class ZstdWriter:
+    def __init__(self, writer, stats, level=DEFAULT_LEVEL, threads=DEFAULT_THREADS):
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' module")
+        self.stats = stats
+        self.counter = _CountingWriter(writer, stats)
+        compressor = zstandard.ZstdCompressor(level=level, threads=threads)
+        self.stream = compressor.stream_writer(self.counter, closefd=False)
+        self.position = 0
+
+    def tell(self):
+        return self.position
+
+    def write(self, data):
+        self.stats.bytes_in += len(data)
+        self.position += len(data)
+        return self.stream.write(data)
+
+    def flush(self):
+        # ends the current frame; concatenated frames decompress as one stream
+        self.stream.flush(zstandard.FLUSH_FRAME)
+
+    def close(self):
+        self.stream.close()
+
+
+class _CountingWriter:
+    def __init__(self, writer, stats):
+        self.writer = writer
+        self.stats = stats
+
+    def write(self, data):
+        self.writer.write(data)
+        self.stats.bytes_out += len(data)
+        return len(data)
+
+
+def archive_extension(fmt):
+    return '.tar.zst' if fmt == 'zstd' else '.tar.gz'
+
+
+def files_index_name(output_file):
+    base = os.path.splitext(output_file)[0]
+    if base.endswith('.tar'):
+        base = base[:-len('.tar')]
+    return base + FILES_EXTENSION
+
+
+def expand_patterns(spec, map_path=None):
+    # spec uses the shell syntax of the acquisition dialog, e.g.
+    # "/Users/*/Library/Mail/ /Users/*/Library/Application\ Support/Firefox/"
+    paths = []
+    for pattern in shlex.split(spec):
+        pattern = map_path(pattern) if map_path else pattern
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(match for match in matches if os.path.lexists(match))
+    return paths
+
+
+def index_line(entry):
+    return (json.dumps(entry, separators=(',', ':')) + "\n").encode()
+
+
+class _MemberReader:
+    # supplies exactly the size in the tar header, whatever the file does
+    # while it is read: a file that shrank or fails to read is padded with
+    # zeros, one that grew is cut at the header size. Once the header is in
+    # the stream the member must be completed, or every later one is lost.
+    def __init__(self, f, size):
+        self.f = f
+        self.remaining = size
+        self.hasher = hashlib.sha256()
+        # bytes the file delivered, counting what it grew by
+        self.size_read = 0
+        self.error = None
+
+    def read(self, size=-1):
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = b''
+        if self.error is None:
+            try:
+                data = self.f.read(size)
+            except OSError as e:
+                self.error = e.strerror or str(e)
+        self.size_read += len(data)
+        if len(data) < size:
+            data += bytes(size - len(data))
+        self.remaining -= size
+        self.hasher.update(data)
+        return data
+
+    def drain(self):
+        # counts what the file grew by beyond the header size
+        if self.error is None:
+            try:
+                for chunk in iter(lambda: self.f.read(CHUNK_SIZE), b''):
+                    self.size_read += len(chunk)
+            except OSError:
+                pass
+
+
+def _error_entry(path, e):
+    return {'path': path, 'error': e.strerror or str(e)}
+
+
+def add_member(tar, entry, base=None):
+    # adds the walked entry, returns it with the sha256 of a file, an error
+    # entry if it could not be opened, or None if its metadata matches the
+    # baseline entry; only files whose content differs from the baseline are
+    # read twice (hashed, then archived). Errors of the source are handled
+    # before anything is written, errors of the output propagate.
+    if same_metadata(entry, base):
+        return None
+    path = entry['path']
+    if entry['type'] != 'file':
+        try:
+            tarinfo = tar.gettarinfo(path)
+        except OSError as e:
+            return _error_entry(path, e)
+        if tarinfo is not None:
+            tar.addfile(tarinfo)
+        return entry
+    try:
+        f = open(path, 'rb')
+    except OSError as e:
+        return _error_entry(path, e)
+    with f:
+        try:
+            if base is not None and base.get('sha256'):
+                hasher = hashlib.sha256()
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+                entry['sha256'] = hasher.hexdigest()
+                if entry['sha256'] == base['sha256']:
+                    return entry
+                f.seek(0)
+            tarinfo = tar.gettarinfo(path, fileobj=f)
+        except OSError as e:
+            return _error_entry(path, e)
+        reader = _MemberReader(f, tarinfo.size)
+        tar.addfile(tarinfo, reader)
+        reader.drain()
+    # sha256 of the member as archived
+    entry['sha256'] = reader.hasher.hexdigest()
+    if reader.size_read != tarinfo.size:
+        entry['size_read'] = reader.size_read
+    if reader.error:
+        entry['read_error'] = reader.error
+    return entry
+
+
+def write_tar(paths, fileobj, stats, skip=0, save_point=None, index=None, baseline=None, walk_filter=None,
+              io_policy=None):
+    # plain 'w' mode writes every member straight through to fileobj, so the
+    # stream can be cut (and later continued) after any member. With a
+    # baseline (a Lookahead over the previous index) only entries that are
+    # new or changed are archived and indexed.
+    def write_index(entry):
+        if index is not None:
+            index.write(index_line(entry))
+
+    with tarfile.open(fileobj=fileobj, mode='w', format=tarfile.PAX_FORMAT) as tar:
+        for entries, entry in enumerate(walk(paths, stats, walk_filter, io_policy=io_policy), 1):
+            path = entry['path']
+            base, passed = baseline.take(path) if baseline else (None, [])
+            if entries <= skip:
+                continue
+            for old_path, _ in passed:
+                stats.removed += 1
+                write_index(removed_entry(old_path))
+            if 'error' not in entry:
+                entry = add_member(tar, entry, base)
+                # the member list of a write-only archive is never used and
+                # would grow with every file of the acquisition
+                tar.members.clear()
+            if entry is None:
+                stats.unchanged += 1
+            elif 'error' in entry:
+                stats.errors.append(f"{path}: {entry['error']}")
+                write_index(entry)
+            else:
+                if baseline:
+                    entry['status'] = delta_status(entry, base)
+                # 'metadata' entries kept their content, it is in the baseline
+                stats.files += entry.get('status') != 'metadata'
+                stats.changed += 'size_read' in entry
+                if 'read_error' in entry:
+                    stats.errors.append(f"{path}: {entry['read_error']} (rest of the member zero-filled)")
+                write_index(entry)
+            if save_point:
+                save_point(tar, entries, path)
+        if baseline:
+            for old_path, _ in baseline.rest():
+                stats.removed += 1
+                write_index(removed_entry(old_path))
+
+
+class SavePoints:
+    # calls save() once enough has been written since the last checkpoint
+    def __init__(self, save, position, nbytes=CHECKPOINT_BYTES, interval=CHECKPOINT_INTERVAL):
+        self.save = save
+        self.position = position
+        self.nbytes = nbytes
+        self.interval = interval
+        self.last_position = position()
+        self.last_time = time.monotonic()
+
+    def __call__(self, *args):
+        position = self.position()
+        if position - self.last_position < self.nbytes and time.monotonic() - self.last_time < self.interval:
+            return
+        self.save(*args)
+        self.last_position, self.last_time = position, time.monotonic()
+
+
+def create_archive(spec, writer, fmt='gzip', level=DEFAULT_LEVEL, threads=DEFAULT_THREADS,
+                   initializer=None, initargs=(), map_path=None, resume=None, checkpoint=None,
+                   index=None, baseline=None, walk_filter=None, io_policy=None):
+    stats = ArchiveStats()
+    if fmt == 'zstd':
+        compressor = ZstdWriter(writer, stats, level=level, threads=threads)
+    else:
+        compressor = ParallelGzipWriter(writer, stats, level=level, threads=threads,
+                                        initializer=initializer, initargs=initargs)
+    if resume:
+        stats.restore(resume)
+        compressor.position = resume['tar_offset']
+
+    def save(tar, entries, path):
+        compressor.flush()
+        writer.sync()
+        if index is not None:
+            index.sync()
+        checkpoint(offset=writer.bytes_written, tar_offset=tar.offset,
+                   index_offset=index.bytes_written if index is not None else None,
+                   entries=entries, path=path, **stats.state())
+
+    try:
+        write_tar(expand_patterns(spec, map_path), compressor, stats,
+                  skip=resume['entries'] if resume else 0,
+                  save_point=SavePoints(save, compressor.tell) if checkpoint else None,
+                  index=index, baseline=baseline, walk_filter=walk_filter, io_policy=io_policy)
+    finally:
+        compressor.close()
+        stats.finish()
+    return stats
+
+
+def acquire(engine, spec, output_file, fmt='gzip', level=DEFAULT_LEVEL, threads=DEFAULT_THREADS, resume=None,
+            baseline=None, walk_filter=None):
+    # baseline: (manifest entry, Lookahead) of the previous full files index, see baseline.py
+    base_entry, lookahead = baseline or (None, None)
+
+    def checkpoint(**state):
+        engine.checkpoint(artifact=output_file, baseline=base_entry and base_entry['name'],
+                          filters=walk_filter.rules() if walk_filter else None, **state)
+
+    with engine.open_artifact(output_file, resume_at=resume['offset'] if resume else None) as writer, \
+            engine.open_artifact(files_index_name(output_file),
+                                 resume_at=resume['index_offset'] if resume else None) as index:
+        if not resume:
+            checkpoint(offset=0, tar_offset=0, index_offset=0, entries=0, path=None, **ArchiveStats().state())
+        stats = create_archive(spec, writer, fmt=fmt, level=level, threads=threads,
+                               initializer=lower_priority,
+                               initargs=(engine.governor.nice, engine.governor.io_policy),
+                               map_path=engine.backend.path, resume=resume, checkpoint=checkpoint,
+                               index=index, baseline=lookahead, walk_filter=walk_filter,
+                               io_policy=engine.governor.io_policy)
+    if stats.errors:
+        with engine.open_artifact(sibling_path(output_file, 'stderr')) as writer:
+            writer.write(''.join(f"{error}\n" for error in stats.errors).encode())
+    return stats
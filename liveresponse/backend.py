@@ -0,0 +1,69 @@
+import os
+import re
+import shlex
+import sys
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LocalBackend:
+    name = 'local'
+    env = None
+
+    def command(self, cmd):
+        return cmd
+
+    def argv(self, args):
+        return list(args)
+
+    def path(self, path):
+        return path
+
+
+class FakeHostBackend:
+    # runs every collector command against liveresponse.fakehost and maps
+    # host paths (/Users, /var/log) into a synthetic tree under root
+    name = 'fakehost'
+
+    def __init__(self, root=None, scale=1.0, recordings=None):
+        self.root = root
+        self.scale = scale
+        self.recordings = recordings
+        self.env = dict(os.environ,
+                        PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_DIR, os.environ.get('PYTHONPATH')])),
+                        FAKEHOST_SCALE=str(scale))
+
+    def _recording(self, cmd):
+        if not self.recordings:
+            return None
+        path = os.path.join(self.recordings, recording_name(cmd))
+        return path if os.path.isfile(path) else None
+
+    def command(self, cmd):
+        cmd = strip_sudo(cmd)
+        recording = self._recording(cmd)
+        if recording:
+            return f"cat {shlex.quote(recording)}"
+        return f"{shlex.quote(sys.executable)} -m liveresponse.fakehost {cmd}"
+
+    def argv(self, args):
+        args = [os.path.basename(args[0])] + list(args[1:])
+        recording = self._recording(' '.join(args))
+        if recording:
+            return ['cat', recording]
+        return [sys.executable, '-m', 'liveresponse.fakehost'] + args
+
+    def path(self, path):
+        if not self.root:
+            return path
+        return os.path.join(self.root, path.lstrip('/'))
+
+
+def strip_sudo(cmd):
+    return re.sub(r'^sudo (-n )?', '', cmd)
+
+
+def recording_name(cmd):
+    # "lsof -i" → lsof_-i.txt
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', strip_sudo(cmd)).strip('_') + '.txt'
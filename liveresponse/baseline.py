@@ -0,0 +1,297 @@
+import collections
+import hashlib
+import json
+import os
+import re
+import sys
+
+from liveresponse.manifest import load_entries
+from liveresponse.output import CHUNK_SIZE, COMPRESSIONS, open_stored
+
+
+# Differential re-collection. A repeat visit compares its output with the
+# most recent full artifact of the same kind on the volume:
+#
+# - command output is stored as a line diff (<name>.diff.txt) that
+#   expands back to the exact bytes of the full output;
+# - file trees are checked against the previous per-file index by metadata
+#   first, only mismatching files are read and hashed, and only added or
+#   changed files are stored.
+#
+# Both sides are walked in the same order, so matching only keeps a bounded
+# window of the baseline in memory; anything that moved further than the
+# window is treated as new.
+
+DIFF_MAGIC = b'#liveresponse-diff 1'
+LINE_WINDOW = 65536
+ENTRY_WINDOW = 16384
+# metadata that changes whenever the content of a file does; ctime cannot be
+# set from user space
+SIGNATURE = ('type', 'size', 'mtime', 'ctime', 'mode', 'uid', 'gid', 'target')
+
+_TIMESTAMP = r'\d{8}_\d{6}_'
+
+
+def find_baseline(output_path, output_file):
+    # latest complete full artifact of the same kind, e.g. 20250101_120000_processes.txt
+    # or its compressed 20250101_120000_processes.txt.gz for 20250102_090000_processes.txt;
+    # returns its manifest entry
+    kind = re.sub('^' + _TIMESTAMP, '', output_file)
+    compressed = '|'.join(re.escape(extension) for extension in COMPRESSIONS.values())
+    pattern = re.compile(_TIMESTAMP + re.escape(kind) + f"({compressed})?")
+    candidates = [entry for name, entry in load_entries(output_path).items()
+                  if pattern.fullmatch(name) and name < output_file]
+    return max(candidates, key=lambda entry: entry['name'], default=None)
+
+
+def diff_name(output_file):
+    root, extension = os.path.splitext(output_file)
+    return f"{root}.diff{extension}"
+
+
+class Lookahead:
+    # matches keys of a new sequence against an old one in mostly the same order
+    def __init__(self, items, window):
+        self.items = iter(items)
+        self.window = window
+        self.ahead = collections.deque()
+        # key → sequence numbers of its occurrences in the window, oldest first
+        self.positions = {}
+        self.count = 0
+        self.exhausted = False
+
+    def _fill(self):
+        while not self.exhausted and len(self.ahead) < self.window:
+            try:
+                key, value = next(self.items)
+            except StopIteration:
+                self.exhausted = True
+                break
+            self.ahead.append((self.count, key, value))
+            self.positions.setdefault(key, collections.deque()).append(self.count)
+            self.count += 1
+
+    def _pop(self):
+        seq, key, value = self.ahead.popleft()
+        seqs = self.positions[key]
+        seqs.popleft()
+        if not seqs:
+            del self.positions[key]
+        return seq, key, value
+
+    def take(self, key):
+        # returns (value, older items that were passed over) or (None, [])
+        self._fill()
+        seqs = self.positions.get(key)
+        if not seqs:
+            return None, []
+        target = seqs[0]
+        skipped = []
+        while True:
+            seq, old_key, value = self._pop()
+            if seq == target:
+                return value, skipped
+            skipped.append((old_key, value))
+
+    def rest(self):
+        self.window = float('inf')
+        self._fill()
+        rest = [(key, value) for _, key, value in self.ahead]
+        self.ahead.clear()
+        self.positions.clear()
+        return rest
+
+
+def _base_lines(path):
+    with open_stored(path) as f:
+        for index, line in enumerate(f):
+            yield line, index
+
+
+class LineDiffWriter:
+    # Stands in for the artifact writer of a command: the output is matched
+    # line by line against the baseline and written as
+    #   =<first line> <count>     copy lines from the baseline
+    #   +<length>                 followed by <length> literal bytes
+    # between a header naming the baseline and a trailer with the size and
+    # SHA-256 of the full output.
+    def __init__(self, writer, base_path, base_entry, window=LINE_WINDOW):
+        self.writer = writer
+        self.base = Lookahead(_base_lines(base_path), window)
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        self.copied = 0
+        self._partial = b''
+        self._literal = bytearray()
+        self._run = None
+        self.writer.write(DIFF_MAGIC + b' ' + json.dumps(
+            {'base': base_entry['name'], 'base_sha256': base_entry['digests']['sha256']}).encode() + b'\n')
+
+    @property
+    def bytes_written(self):
+        return self.size
+
+    def write(self, data):
+        self.hasher.update(data)
+        self.size += len(data)
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self._line(line + b'\n')
+
+    def _line(self, line):
+        index, _ = self.base.take(line)
+        if index is None:
+            self._end_run()
+            self._literal += line
+            if len(self._literal) >= CHUNK_SIZE:
+                self._flush_literal()
+            return
+        self.copied += len(line)
+        if self._run and self._run[0] + self._run[1] == index:
+            self._run[1] += 1
+            return
+        self._end_run()
+        self._run = [index, 1]
+
+    def _flush_literal(self):
+        if self._literal:
+            self.writer.write(b'+%d\n' % len(self._literal) + bytes(self._literal))
+            self._literal = bytearray()
+
+    def _end_run(self):
+        self._flush_literal()
+        if self._run:
+            self.writer.write(b'=%d %d\n' % tuple(self._run))
+            self._run = None
+
+    def close(self):
+        try:
+            if self._partial:
+                # last line without a newline is always literal
+                self._end_run()
+                self._literal += self._partial
+                self._partial = b''
+            self._end_run()
+            self.writer.write(b'#end ' + json.dumps({'size': self.size, 'sha256': self.hasher.hexdigest()}).encode()
+                              + b'\n')
+        finally:
+            self.writer.close()
+
+
+def is_diff(name):
+    return os.path.splitext(name)[0].endswith('.diff')
+
+
+def expand_diff(diff_path, out):
+    # writes the full output a diff was made from; returns (size, sha256) as recorded in the trailer
+    with open(diff_path, 'rb') as diff:
+        header = diff.readline()
+        if not header.startswith(DIFF_MAGIC):
+            raise ValueError(f"{diff_path} is not a liveresponse diff")
+        base_name = json.loads(header[len(DIFF_MAGIC):])['base']
+        with open_stored(os.path.join(os.path.dirname(diff_path), base_name)) as base:
+            # copied runs only ever move forward through the baseline, so it is
+            # read once from start to end, which also works for compressed ones
+            position = 0
+            for op in iter(diff.readline, b''):
+                if op.startswith(b'='):
+                    first, count = map(int, op[1:].split())
+                    if first < position:
+                        raise ValueError(f"{diff_path}: line {first} is behind line {position} of the baseline")
+                    for _ in range(first - position):
+                        _line(base, diff_path)
+                    run = bytearray()
+                    for _ in range(count):
+                        run += _line(base, diff_path)
+                        if len(run) >= CHUNK_SIZE:
+                            out.write(bytes(run))
+                            run = bytearray()
+                    if run:
+                        out.write(bytes(run))
+                    position = first + count
+                elif op.startswith(b'+'):
+                    _copy(diff, out, int(op[1:]), diff_path)
+                elif op.startswith(b'#end '):
+                    trailer = json.loads(op[5:])
+                    return trailer['size'], trailer['sha256']
+                else:
+                    raise ValueError(f"{diff_path}: unexpected {op[:40]!r}")
+    raise ValueError(f"{diff_path} has no trailer, the collection was interrupted")
+
+
+def _line(base, diff_path):
+    line = base.readline()
+    if not line:
+        raise ValueError(f"{diff_path} is truncated or its baseline changed")
+    return line
+
+
+def _copy(src, out, remaining, diff_path):
+    while remaining:
+        chunk = src.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            raise ValueError(f"{diff_path} is truncated or its baseline changed")
+        out.write(chunk)
+        remaining -= len(chunk)
+
+
+def read_index(path):
+    # (path, entry) pairs of a full per-file index
+    with open(path) as f:
+        for line in f:
+            entry = json.loads(line)
+            if 'path' in entry and 'error' not in entry:
+                yield entry['path'], entry
+
+
+def index_baseline(output_path, index_file, base_name=None):
+    # (manifest entry, Lookahead over its entries) of the index an acquisition
+    # is compared with; base_name is the one an interrupted run had chosen
+    if base_name:
+        base = load_entries(output_path).get(base_name)
+    else:
+        base = find_baseline(output_path, index_file)
+    if base is None or not os.path.exists(os.path.join(output_path, base['name'])):
+        return None
+    return base, Lookahead(read_index(os.path.join(output_path, base['name'])), ENTRY_WINDOW)
+
+
+def same_metadata(entry, base):
+    return base is not None and all(entry.get(name) == base.get(name) for name in SIGNATURE)
+
+
+def delta_status(entry, base):
+    # status of an entry that does not match its baseline entry
+    if base is None:
+        return 'added'
+    if entry['type'] == 'file' and base['type'] == 'file' and entry.get('sha256') == base.get('sha256'):
+        return 'metadata'
+    return 'changed'
+
+
+def removed_entry(path):
+    return {'path': path, 'status': 'removed'}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        sys.stderr.write("usage: python3 -m liveresponse.baseline <name.diff.txt>   (full output on stdout)\n")
+        return 2
+    hasher = hashlib.sha256()
+
+    class Out:
+        def write(self, data):
+            hasher.update(data)
+            sys.stdout.buffer.write(data)
+
+    _, digest = expand_diff(argv[0], Out())
+    if hasher.hexdigest() != digest:
+        sys.stderr.write(f"✗ expanded output does not match the recorded SHA-256 {digest}\n")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from liveresponse.backend import FakeHostBackend, PROJECT_DIR
+from liveresponse.collectors import COLLECTORS, queue_acquisition, queue_profile
+from liveresponse.engine import CollectionEngine, DEFAULT_WORKERS
+from liveresponse.fakehost import build_tree
+from liveresponse.output import MB
+from liveresponse.report import rss_bytes
+
+
+BENCHMARKS = list(COLLECTORS) + ['acquisition', 'run_all_response']
+
+
+def peak_rss(who):
+    return rss_bytes(resource.getrusage(who).ru_maxrss)
+
+
+def run_child(args):
+    backend = FakeHostBackend(root=args.root, scale=args.scale, recordings=args.recordings)
+    engine = CollectionEngine(args.out, max_workers=args.workers, log=lambda message: None,
+                              backend=backend, options={'adaptive': not args.fixed_workers})
+    if args.child == 'run_all_response':
+        queue_profile(engine, 'all')
+    elif args.child == 'acquisition':
+        queue_acquisition(engine, "/Users/", "Complete /Users Directory")
+    else:
+        COLLECTORS[args.child](engine)
+
+    started = time.monotonic()
+    jobs, elapsed = engine.run_sync()
+    first = engine.manifest.first_recorded
+    written = sum(entry['size'] for entry in engine.manifest.entries.values())
+    print(json.dumps({
+        'benchmark': args.child,
+        'jobs': len(jobs),
+        'errors': [job.error for job in jobs if job.error],
+        'wall_s': elapsed,
+        'bytes': written,
+        'bytes_per_s': written / elapsed if elapsed else 0.0,
+        'time_to_first_artifact_s': first - started if first else None,
+        'peak_rss_bytes': peak_rss(resource.RUSAGE_SELF),
+        'peak_child_rss_bytes': peak_rss(resource.RUSAGE_CHILDREN),
+    }))
+    return 0
+
+
+def run_benchmarks(args):
+    names = BENCHMARKS if args.collectors == 'all' else args.collectors.split(',')
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    workdir = tempfile.mkdtemp(prefix='liveresponse_bench_')
+    root = args.root or os.path.join(workdir, 'host')
+    try:
+        started = time.monotonic()
+        if not args.root:
+            build_tree(root)
+        print(f"fake host: {root} (scale {args.scale}, built in {time.monotonic() - started:.1f}s)",
+              file=sys.stderr)
+
+        results = []
+        for name in names:
+            out = os.path.join(workdir, name)
+            os.makedirs(out)
+            cmd = [sys.executable, '-m', 'liveresponse.bench', '--child', name, '--out', out,
+                   '--root', root, '--scale', str(args.scale), '--workers', str(args.workers)]
+            if args.recordings:
+                cmd += ['--recordings', args.recordings]
+            if args.fixed_workers:
+                cmd.append('--fixed-workers')
+            env = dict(os.environ, FAKEHOST_SCALE=str(args.scale))
+            child = subprocess.run(cmd, capture_output=True, text=True, cwd=PROJECT_DIR, env=env)
+            if child.returncode:
+                raise SystemExit(f"{name} failed:\n{child.stderr}")
+            results.append(json.loads(child.stdout.strip().splitlines()[-1]))
+            shutil.rmtree(out, ignore_errors=True)
+            print_result(results[-1])
+
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({'scale': args.scale, 'workers': args.workers, 'results': results}, f, indent=2)
+        return 0
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def print_result(result):
+    first = result['time_to_first_artifact_s']
+    print(f"{result['benchmark']:<18} {result['wall_s']:>8.2f}s {result['bytes'] / MB:>10.1f} MB "
+          f"{result['bytes_per_s'] / MB:>9.1f} MB/s  first {first if first is not None else float('nan'):>6.2f}s  "
+          f"rss {result['peak_rss_bytes'] / MB:>7.1f} MB  child rss {result['peak_child_rss_bytes'] / MB:>7.1f} MB"
+          + (f"  errors {len(result['errors'])}" if result['errors'] else ""), flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m liveresponse.bench',
+                                     description="Benchmark the collectors against a synthetic macOS host.")
+    parser.add_argument('--collectors', default='all',
+                        help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="output size multiplier (1 ≈ 200k lsof lines, 24h of logs at 1 line/s)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--fixed-workers', action='store_true')
+    parser.add_argument('--root', help="existing fake host tree (default: generate one)")
+    parser.add_argument('--recordings', help="directory of recorded command outputs to replay")
+    parser.add_argument('--json', help="write results to this file")
+    parser.add_argument('--keep', action='store_true', help="keep the work directory")
+    parser.add_argument('--child', choices=BENCHMARKS, help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    return run_child(args) if args.child else run_benchmarks(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,247 @@
+import errno
+import hashlib
+import json
+import os
+import shutil
+import stat
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from liveresponse.governor import TokenBucket, lower_priority
+from liveresponse.output import MB
+
+
+TRUSTED_DIRECTORIES = ['/usr/bin', '/bin', '/usr/sbin', '/sbin', '/usr/X11/bin']
+# extra copies at the volume root, kept for the existing stick layout
+ROOT_FILES = {'/usr/sbin/system_profiler': 'system_profiler'}
+MANIFEST_NAME = '.trusted_binaries.json'
+DEFAULT_WORKERS = 8
+CHUNK_SIZE = 1024 * 1024
+
+
+class DeployStats:
+    def __init__(self):
+        self.copied = 0
+        self.copied_bytes = 0
+        self.linked = 0
+        self.linked_bytes = 0
+        self.skipped = 0
+        self.skipped_bytes = 0
+        self.errors = []
+        self.started = time.monotonic()
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started
+        return (f"copied {self.copied} files ({self.copied_bytes / MB:.1f} MB), "
+                f"hard-linked {self.linked} duplicates ({self.linked_bytes / MB:.1f} MB), "
+                f"skipped {self.skipped} unchanged ({self.skipped_bytes / MB:.1f} MB) "
+                f"in {elapsed:.1f}s")
+
+
+def sha256_file(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def zero_copy(src, dst):
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), CHUNK_SIZE * 64):
+                    pass
+                return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+    # fcopyfile() on macOS, sendfile() on Linux
+    shutil.copyfile(src, dst)
+
+
+def load_manifest(volume_path):
+    try:
+        with open(os.path.join(volume_path, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(volume_path, manifest):
+    path = os.path.join(volume_path, MANIFEST_NAME)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def plan(directories=TRUSTED_DIRECTORIES, root_files=ROOT_FILES):
+    files = []
+    links = []
+    dirs = []
+    for directory in dict.fromkeys(directories):
+        if not os.path.isdir(directory):
+            continue
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirs.append(dirpath.lstrip('/'))
+            for name in sorted(dirnames + filenames):
+                src = os.path.join(dirpath, name)
+                rel = src.lstrip('/')
+                if os.path.islink(src):
+                    links.append((src, rel))
+                elif name in filenames and os.path.isfile(src):
+                    files.append((src, rel))
+    for src, rel in root_files.items():
+        if os.path.isfile(src):
+            files.append((src, rel))
+    return dirs, links, files
+
+
+def _link_symlink(src, dst):
+    target = os.readlink(src)
+    if os.path.islink(dst) and os.readlink(dst) == target:
+        return False
+    if os.path.lexists(dst):
+        os.remove(dst)
+    os.symlink(target, dst)
+    return True
+
+
+def _inspect(src, rel, dst, entry):
+    st = os.stat(src)
+    unchanged = (entry and os.path.isfile(dst) and entry.get('size') == st.st_size
+                 and entry.get('mtime_ns') == st.st_mtime_ns)
+    if unchanged:
+        return st, entry['sha256'], True
+    digest = sha256_file(src)
+    same_content = (entry and entry.get('sha256') == digest and os.path.isfile(dst)
+                    and os.path.getsize(dst) == st.st_size)
+    return st, digest, bool(same_content)
+
+
+def _install(src, dst, st, link_from=None):
+    tmp = f"{dst}.partial"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    if link_from:
+        os.link(link_from, tmp)
+    else:
+        zero_copy(src, tmp)
+        os.chmod(tmp, stat.S_IMODE(st.st_mode) & 0o777)
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(tmp, dst)
+
+
+def deploy(volume_path, directories=TRUSTED_DIRECTORIES, root_files=ROOT_FILES,
+           workers=DEFAULT_WORKERS, log=print, throttle=None):
+    stats = DeployStats()
+    old_manifest = load_manifest(volume_path)
+    manifest = {}
+
+    dirs, links, files = plan(directories, root_files)
+    log(f"{len(files)} files, {len(links)} symlinks in {len(directories)} directories")
+
+    for rel in dirs:
+        os.makedirs(os.path.join(volume_path, rel), exist_ok=True)
+
+    for src, rel in links:
+        dst = os.path.join(volume_path, rel)
+        try:
+            _link_symlink(src, dst)
+            manifest[rel] = {'symlink': os.readlink(src)}
+        except OSError as e:
+            stats.errors.append(f"{src}: {e.strerror or e}")
+
+    def inspect(item):
+        src, rel = item
+        dst = os.path.join(volume_path, rel)
+        try:
+            return item, _inspect(src, rel, dst, old_manifest.get(rel)), None
+        except OSError as e:
+            return item, None, f"{src}: {e.strerror or e}"
+
+    # phase 1: metadata check, hashing only new or changed files
+    pending = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for (src, rel), result, error in pool.map(inspect, files):
+            if error:
+                stats.errors.append(error)
+                continue
+            st, digest, unchanged = result
+            manifest[rel] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest}
+            if unchanged:
+                stats.skipped += 1
+                stats.skipped_bytes += st.st_size
+            else:
+                pending.setdefault(digest, []).append((src, rel, st))
+
+    # content already on the stick can be hard-linked instead of copied
+    on_stick = {}
+    for rel, entry in manifest.items():
+        digest = entry.get('sha256')
+        if digest and digest not in pending and digest not in on_stick:
+            on_stick[digest] = os.path.join(volume_path, rel)
+
+    def install_group(group):
+        digest, items = group
+        results = []
+        first = on_stick.get(digest)
+        for src, rel, st in items:
+            dst = os.path.join(volume_path, rel)
+            try:
+                if throttle and first is None:
+                    throttle.consume(st.st_size)
+                _install(src, dst, st, link_from=first)
+                results.append((src, rel, st, first is not None, None))
+                first = first or dst
+            except OSError as e:
+                results.append((src, rel, st, False, f"{src}: {e.strerror or e}"))
+        return results
+
+    # phase 2: one copy per unique content, the rest become hard links
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for results in pool.map(install_group, pending.items()):
+            for src, rel, st, linked, error in results:
+                if error:
+                    stats.errors.append(error)
+                    manifest.pop(rel, None)
+                elif linked:
+                    stats.linked += 1
+                    stats.linked_bytes += st.st_size
+                else:
+                    stats.copied += 1
+                    stats.copied_bytes += st.st_size
+
+    for rel, entry in old_manifest.items():
+        # keep entries of files that vanished from the host so the stick stays described
+        if rel not in manifest and os.path.lexists(os.path.join(volume_path, rel)):
+            manifest[rel] = entry
+
+    save_manifest(volume_path, manifest)
+    return stats
+
+
+def main(argv):
+    limit = None
+    if len(argv) == 3 and argv[0] == '--limit':
+        limit, argv = float(argv[1]), argv[2:]
+    if len(argv) != 1:
+        print(f"usage: {sys.executable} -m liveresponse.binaries [--limit MB/s] /Volumes/<usb>",
+              file=sys.stderr)
+        return 2
+    throttle = TokenBucket(limit * MB, burst=int(limit * MB)) if limit else None
+    # a background copy, the host keeps priority
+    lower_priority()
+    stats = deploy(argv[0], log=lambda message: print(message, flush=True), throttle=throttle)
+    for error in stats.errors:
+        print(f"⚠ {error}", flush=True)
+    print(f"✓ {stats.summary()}", flush=True)
+    return 1 if stats.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,213 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+
+from liveresponse.archive import DEFAULT_LEVEL, DEFAULT_THREADS, LEVELS
+from liveresponse.collectors import (ACQUISITION_FORMATS, ACQUISITION_TARGETS, profile_names, queue_acquisition,
+                                     queue_profile)
+from liveresponse.engine import CollectionEngine, DEFAULT_WORKERS
+from liveresponse.evidence import EVIDENCE_DB, index_collection
+from liveresponse.governor import DEFAULT_NICE
+from liveresponse.manifest import DEFAULT_DIGESTS, JOURNAL, Manifest, RUN_REPORT
+from liveresponse.merkle import DEFAULT_CHUNK_SIZE
+from liveresponse.output import COMPRESSIONS, DEFAULT_FSYNC, FSYNC_POLICIES, MB, WRITE_BUFFER
+from liveresponse.system_profiler import DETAIL_LEVELS
+from liveresponse.unified_logs import STYLES
+from liveresponse.verify import DEFAULT_WORKERS as VERIFY_WORKERS, verify_collection
+from liveresponse.walker import WalkFilter, parse_time
+
+
+def log(message):
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] {message}", flush=True)
+
+
+def megabytes(value):
+    return round(float(value) * MB)
+
+
+def new_engine(args):
+    if not os.path.isdir(args.out):
+        raise SystemExit(f"✗ Output directory not found: {args.out}")
+    options = {}
+    for name in ('log_slices', 'log_style', 'log_hours', 'log_binary',
+                 'adaptive', 'write_limit', 'nice', 'io_policy', 'index', 'resume', 'baseline', 'chunk_size',
+                 'profiler_detail', 'compression', 'fsync', 'write_buffer'):
+        if getattr(args, name, None) is not None:
+            options[name] = getattr(args, name)
+    return CollectionEngine(args.out, max_workers=args.workers, log=log,
+                            digests=tuple(args.digest or DEFAULT_DIGESTS), options=options)
+
+
+def run_engine(engine):
+    jobs, elapsed = engine.run_sync()
+    failed = [job for job in jobs if job.error and not job.optional]
+    finished = [job for job in jobs if not job.error]
+    log(f"{'✗' if failed else '✓'} {len(finished)}/{len(jobs)} jobs finished in {elapsed:.1f}s")
+    log(f"✓ Hashed on write → manifest.json, checksums.txt ({len(engine.manifest.entries)} artifacts)")
+    log(f"✓ Job timings → {RUN_REPORT}")
+    return 1 if failed else 0
+
+
+def cmd_collect(args):
+    engine = new_engine(args)
+    try:
+        queue_profile(engine, args.profile)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"✗ Profile {args.profile}: {e}")
+    log(f"Starting live response collection '{args.profile}' ({engine.max_workers} parallel jobs)")
+    return run_engine(engine)
+
+
+def cmd_acquire(args):
+    engine = new_engine(args)
+    if args.path:
+        spec, name = args.path, args.name or 'Custom'
+    else:
+        spec, name = ACQUISITION_TARGETS[args.target], args.name or args.target
+    walk_filter = WalkFilter(max_size=args.max_size, newer=args.since, older=args.until,
+                             extensions=[ext for value in args.ext or () for ext in value.split(',')],
+                             exclude=args.exclude or (), skip_caches=args.skip_caches)
+    log(f"Starting logical acquisition: {name} ({args.format}, level {args.level}, {args.threads} threads)...")
+    queue_acquisition(engine, spec, name, fmt=args.format, level=args.level, threads=args.threads,
+                      walk_filter=walk_filter or None)
+    return run_engine(engine)
+
+
+def cmd_hash(args):
+    if not os.path.isdir(args.out):
+        raise SystemExit(f"✗ Output directory not found: {args.out}")
+    manifest = Manifest(args.out, tuple(args.digest or DEFAULT_DIGESTS), chunk_size=args.chunk_size)
+    hashed = manifest.hash_missing()
+    count = manifest.save()
+    log(f"✓ {len(hashed)} unlisted file(s) hashed, {count} in manifest → checksums.txt")
+    return 0
+
+
+def cmd_index(args):
+    if not os.path.isdir(args.out):
+        raise SystemExit(f"✗ Output directory not found: {args.out}")
+    feeds = index_collection(args.out, log=log)
+    manifest = Manifest(args.out)
+    manifest.hash_file(os.path.join(args.out, EVIDENCE_DB))
+    manifest.save()
+    log(f"✓ {len(feeds)} artifact(s) indexed → {EVIDENCE_DB}")
+    return 1 if any(feed.error for feed in feeds) else 0
+
+
+def cmd_verify(args):
+    if not os.path.isdir(args.out):
+        raise SystemExit(f"✗ Output directory not found: {args.out}")
+    result = verify_collection(args.out, workers=args.workers, chunks=args.chunks, log=log)
+    log(f"{'✓' if result.ok else '✗'} {result.summary()}")
+    return 0 if result.ok else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='forensic_usb_tool',
+        description="Headless live response collection. Run without arguments for the GUI.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_chunk_hashes(sub):
+        sub.add_argument('--chunk-hashes', dest='chunk_size', action='store_const', const=DEFAULT_CHUNK_SIZE,
+                         help=f"also record a hash tree over {DEFAULT_CHUNK_SIZE // MB} MB chunks "
+                              "(parallel hashing and verification of large artifacts)")
+
+    def add_common(sub):
+        sub.add_argument('--out', required=True, help="output volume, e.g. /Volumes/forensic")
+        sub.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="parallel jobs")
+        sub.add_argument('--digest', action='append',
+                         help="additional digest algorithm (hashlib name), repeatable")
+        sub.add_argument('--fixed-workers', dest='adaptive', action='store_false', default=None,
+                         help="always run --workers jobs instead of adapting to throughput and load")
+        sub.add_argument('--write-limit', type=float, help="cap artifact writes at this many MB/s")
+        sub.add_argument('--nice', type=int, help=f"nice increment for jobs (default {DEFAULT_NICE})")
+        sub.add_argument('--io-policy', choices=['utility', 'throttle'],
+                         help="disk I/O priority for jobs (default utility)")
+        sub.add_argument('--fsync', choices=FSYNC_POLICIES,
+                         help=f"when artifacts are synced to the volume: each one, in batches or once at the "
+                              f"end (default {DEFAULT_FSYNC})")
+        sub.add_argument('--write-buffer', type=megabytes,
+                         help=f"size of the writes to the volume in MB (default {WRITE_BUFFER // MB})")
+        sub.add_argument('--resume', action='store_true', default=None,
+                         help=f"skip jobs an interrupted run already finished ({JOURNAL})")
+        sub.add_argument('--baseline', action='store_true', default=None,
+                         help="store only what changed since the last full collection on the volume "
+                              "(command output as diffs, acquisitions as new and changed files)")
+        add_chunk_hashes(sub)
+
+    collect = subparsers.add_parser('collect', help="run live response collectors")
+    add_common(collect)
+    collect.add_argument('--profile', default='all',
+                         help=f"{', '.join(profile_names())} or a profile JSON file (default all)")
+    collect.add_argument('--log-hours', type=int, help="unified log window in hours (default 24)")
+    collect.add_argument('--log-slices', type=int, help="time slices extracted in parallel (default 4)")
+    collect.add_argument('--log-style', choices=STYLES, help="log show --style")
+    collect.add_argument('--log-binary', help=argparse.SUPPRESS)
+    collect.add_argument('--compress', dest='compression', choices=('none',) + tuple(COMPRESSIONS),
+                         help="compress command output while it is written (default from the profile)")
+    collect.add_argument('--profiler-detail', choices=DETAIL_LEVELS,
+                         help="system_profiler -detailLevel (default from the profile)")
+    collect.add_argument('--no-index', dest='index', action='store_false', default=None,
+                         help=f"do not parse process and network output into {EVIDENCE_DB}")
+    collect.set_defaults(func=cmd_collect)
+
+    acquire = subparsers.add_parser('acquire', help="logical acquisition into a compressed tar")
+    add_common(acquire)
+    target = acquire.add_mutually_exclusive_group(required=True)
+    target.add_argument('--target', choices=list(ACQUISITION_TARGETS))
+    target.add_argument('--path', help="shell-style path list, e.g. '/Users/*/Documents/'")
+    acquire.add_argument('--name', help="archive name (defaults to the target name)")
+    acquire.add_argument('--format', default='gzip', choices=ACQUISITION_FORMATS,
+                         help="compressed tar, or 'store' for the deduplicating content store")
+    acquire.add_argument('--level', type=int, default=DEFAULT_LEVEL,
+                         help=f"compression level, gzip {'-'.join(map(str, LEVELS['gzip']))}, "
+                              f"zstd {'-'.join(map(str, LEVELS['zstd']))} (default {DEFAULT_LEVEL})")
+    acquire.add_argument('--threads', type=int, default=DEFAULT_THREADS)
+    acquire.add_argument('--max-size', type=megabytes,
+                         help="leave out files larger than this many MB")
+    acquire.add_argument('--since', type=parse_time,
+                         help="only files modified since this date (YYYY-MM-DD[THH:MM]) or this many days ago")
+    acquire.add_argument('--until', type=parse_time, help="only files modified before this date or this many days ago")
+    acquire.add_argument('--ext', action='append',
+                         help="only files with these extensions, e.g. 'plist,db,sqlite', repeatable")
+    acquire.add_argument('--exclude', action='append',
+                         help="leave out files and directories whose name matches this pattern, repeatable")
+    acquire.add_argument('--skip-caches', action='store_true',
+                         help="do not descend into cache directories (Caches, .cache, GPUCache, ...)")
+    acquire.set_defaults(func=cmd_acquire)
+
+    hash_cmd = subparsers.add_parser('hash', help="hash artifacts missing from the manifest")
+    hash_cmd.add_argument('--out', required=True)
+    hash_cmd.add_argument('--digest', action='append')
+    add_chunk_hashes(hash_cmd)
+    hash_cmd.set_defaults(func=cmd_hash)
+
+    verify = subparsers.add_parser('verify', help="check artifacts against manifest.json (read-only)")
+    verify.add_argument('--out', required=True, help="collection volume or a copy of it")
+    verify.add_argument('--workers', type=int, default=VERIFY_WORKERS, help="files / chunks hashed in parallel")
+    verify.add_argument('--no-chunks', dest='chunks', action='store_false',
+                        help="always compare the plain digests, even where a hash tree was recorded")
+    verify.set_defaults(func=cmd_verify)
+
+    index = subparsers.add_parser('index', help=f"parse existing raw artifacts into {EVIDENCE_DB}")
+    index.add_argument('--out', required=True)
+    index.set_defaults(func=cmd_index)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'acquire' and args.format in LEVELS:
+        low, high = LEVELS[args.format]
+        if not low <= args.level <= high:
+            parser.error(f"--level must be {low}-{high} with --format {args.format}")
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,268 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+from liveresponse.archive import (DEFAULT_LEVEL, DEFAULT_THREADS, DELTA, FORMATS, acquire, archive_extension,
+                                  files_index_name)
+from liveresponse.baseline import index_baseline
+from liveresponse.evidence import PARSERS
+from liveresponse.history import EXTRA_HOMES, USERS_DIR, collect_histories, user_homes
+from liveresponse.output import COMPRESSIONS, MB, compressed_name, copy_stream, sibling_path
+from liveresponse.store import STORE_DIR, STORE_EXTENSION, STORE_FORMAT, acquire_store
+from liveresponse.system_profiler import DEFAULT_CONCURRENCY, DEFAULT_DETAIL, DEFAULT_TYPE_TIMEOUT, collect
+from liveresponse.unified_logs import DEFAULT_SLICES, extract
+from liveresponse.walker import WalkFilter
+
+
+ACQUISITION_TARGETS = {
+    "Complete /Users Directory": "/Users/",
+    "Documents Only": "/Users/*/Documents/",
+    "Desktop Only": "/Users/*/Desktop/",
+    "Downloads Only": "/Users/*/Downloads/",
+    "Mail & Messages": "/Users/*/Library/Mail/ /Users/*/Library/Messages/",
+    "Safari History & Cache": "/Users/*/Library/Safari/",
+    "Chrome Profile": "/Users/*/Library/Application\\ Support/Google/Chrome/",
+    "Firefox Profile": "/Users/*/Library/Application\\ Support/Firefox/",
+    "Complete /Users/*/Library": "/Users/*/Library/",
+    "All User Home Directories": "/Users/*/"
+}
+
+ACQUISITION_FORMATS = FORMATS + (STORE_FORMAT,)
+
+# collection profiles: which commands run, their output names, priority,
+# timeout and whether a failure is acceptable. "all" is the default profile,
+# its sections (system, processes, ...) can be run on their own
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+DEFAULT_PROFILE = 'default'
+BUILTIN_PROFILES = {'all': DEFAULT_PROFILE, 'quick': 'quick'}
+
+
+def new_timestamp():
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def load_profile(name):
+    # a built-in profile (profiles/<name>.json), a section of the default
+    # profile or the path of a profile file; returns {section: [step, ...]}
+    if os.path.isfile(name):
+        path, section = name, None
+    elif name in BUILTIN_PROFILES:
+        path, section = os.path.join(PROFILE_DIR, f"{BUILTIN_PROFILES[name]}.json"), None
+    else:
+        path, section = os.path.join(PROFILE_DIR, f"{DEFAULT_PROFILE}.json"), name
+    with open(path) as f:
+        profile = json.load(f)
+    sections = profile['sections']
+    if section is not None:
+        if section not in sections:
+            raise ValueError(f"unknown profile '{name}', choose one of {', '.join(profile_names())} or a JSON file")
+        sections = {section: sections[section]}
+    for steps in sections.values():
+        for number, step in enumerate(steps, 1):
+            # the profile's compression applies to every step that does not choose its own
+            step.setdefault('compression', profile.get('compression'))
+            check_step(step, f"{os.path.basename(path)}, step {number}")
+    return sections
+
+
+def check_step(step, where):
+    collector = step.get('collector', 'command')
+    if collector not in STEPS:
+        raise ValueError(f"{where}: unknown collector '{collector}'")
+    required = ('description', 'command', 'output') if collector == 'command' else ('description',)
+    missing = [key for key in required if key not in step]
+    if missing:
+        raise ValueError(f"{where}: missing {', '.join(missing)}")
+    if step.get('parser') and step['parser'] not in PARSERS:
+        raise ValueError(f"{where}: unknown parser '{step['parser']}'")
+    if step.get('compression') not in (None, 'none') + tuple(COMPRESSIONS):
+        raise ValueError(f"{where}: unknown compression '{step['compression']}'")
+
+
+def step_compression(engine, step):
+    # --compress overrides the profile; 'none' stores plain text
+    compression = engine.options.get('compression', step.get('compression'))
+    return None if compression == 'none' else compression
+
+
+def profile_names():
+    with open(os.path.join(PROFILE_DIR, f"{DEFAULT_PROFILE}.json")) as f:
+        sections = list(json.load(f)['sections'])
+    return ['all'] + sorted(set(BUILTIN_PROFILES) - {'all'}) + sections
+
+
+def queue_steps(engine, steps):
+    timestamp = new_timestamp()
+    for step in steps:
+        STEPS[step.get('collector', 'command')](engine, timestamp, step)
+
+
+def queue_command(engine, timestamp, step):
+    engine.submit_command(step['command'], f"{timestamp}_{step['output']}", step['description'],
+                          parser=step.get('parser'), timeout=step.get('timeout'),
+                          optional=step.get('optional', False), priority=step.get('priority', 0),
+                          volatile=step.get('volatile', False), compression=step_compression(engine, step))
+
+
+def queue_histories(engine, timestamp, step):
+    # errors propagate so the engine records the job as failed and --resume retries it
+    def collect_history(engine):
+        homes = user_homes(engine.backend.path(USERS_DIR),
+                           {user: engine.backend.path(home) for user, home in EXTRA_HOMES.items()})
+        index_file, records = collect_histories(engine, timestamp, homes)
+        users = len({record['user'] for record in records})
+        copied = sum(record['copied'] for record in records)
+        engine.log(f"✓ Shell Histories → {timestamp}_shell_history_*.txt "
+                   f"({len(records)} files, {users} users, {copied / MB:.1f} MB)")
+        for record in records:
+            if record['error']:
+                engine.log(f"⚠ {record['path']}: {record['error']}")
+
+    engine.submit_call(collect_history, step['description'], optional=step.get('optional', False),
+                       priority=step.get('priority', 0))
+
+
+def queue_system_log(engine, timestamp, step):
+    def copy_log(engine):
+        with open(engine.backend.path('/var/log/system.log'), 'rb') as src, \
+                engine.open_artifact(f"{timestamp}_system.log") as writer:
+            copy_stream(src, writer)
+        engine.log("✓ system.log copied")
+
+    engine.submit_call(copy_log, step['description'], optional=step.get('optional', False),
+                       priority=step.get('priority', 0))
+
+
+def queue_unified_logs(engine, timestamp, step):
+    slices = engine.options.get('log_slices', DEFAULT_SLICES)
+    style = engine.options.get('log_style')
+    hours = engine.options.get('log_hours', step.get('hours', 24))
+    log_binary = engine.options.get('log_binary', 'log')
+    ext = 'ndjson' if style == 'ndjson' else 'txt'
+    description = step['description'].format(hours=hours)
+    compression = step_compression(engine, step)
+    output_file = compressed_name(f"{timestamp}_{step['output'].format(hours=hours)}.{ext}", compression)
+
+    async def extract_logs(engine):
+        ranges, returncodes, size = await extract(
+            engine, output_file, window=timedelta(hours=hours), slices=slices, style=style,
+            predicate=step.get('predicate'), log_binary=log_binary, compression=compression)
+        engine.log(f"✓ {description} → {output_file} ({len(ranges)} slices, {size / MB:.1f} MB)")
+        if any(returncodes):
+            engine.log(f"⚠ {description}: slice exit status {returncodes}")
+
+    engine.submit_async(extract_logs, description, timeout=step.get('timeout'),
+                        optional=step.get('optional', False), priority=step.get('priority', 0))
+
+
+def queue_system_profiler(engine, timestamp, step):
+    detail = engine.options.get('profiler_detail', step.get('detail', DEFAULT_DETAIL))
+    compression = step_compression(engine, step)
+    output_file = compressed_name(f"{timestamp}_{step.get('output', 'system_profiler')}.json", compression)
+
+    async def profile(engine):
+        names, skipped, errors, size = await collect(
+            engine, output_file, detail=detail, skip_slow=step.get('skip_slow', False),
+            concurrency=step.get('concurrency', DEFAULT_CONCURRENCY),
+            timeout=step.get('type_timeout', DEFAULT_TYPE_TIMEOUT), compression=compression)
+        note = f", {len(skipped)} slow types skipped" if skipped else ""
+        engine.log(f"✓ {step['description']} → {output_file} ({len(names)} data types, {detail}, "
+                   f"{size / MB:.1f} MB{note})")
+        for name, error in sorted(errors.items()):
+            engine.log(f"⚠ {name}: {error}")
+
+    engine.submit_async(profile, step['description'], timeout=step.get('timeout'),
+                        optional=step.get('optional', False), priority=step.get('priority', 0))
+
+
+STEPS = {
+    'command': queue_command,
+    'shell_histories': queue_histories,
+    'system_log': queue_system_log,
+    'unified_logs': queue_unified_logs,
+    'system_profiler': queue_system_profiler,
+}
+
+
+def queue_section(engine, section):
+    queue_steps(engine, load_profile(section)[section])
+
+
+def queue_system_info(engine):
+    queue_section(engine, 'system')
+
+
+def queue_filevault(engine):
+    queue_section(engine, 'filevault')
+
+
+def queue_processes(engine):
+    queue_section(engine, 'processes')
+
+
+def queue_network(engine):
+    queue_section(engine, 'network')
+
+
+def queue_users(engine):
+    queue_section(engine, 'users')
+
+
+def queue_logs(engine):
+    queue_section(engine, 'logs')
+
+
+def queue_acquisition(engine, spec, name, fmt='gzip', level=DEFAULT_LEVEL, threads=DEFAULT_THREADS, walk_filter=None):
+    # walk_filter: WalkFilter limiting what is taken (size, mtime, extensions, caches)
+    safe_name = name.replace(" ", "_").replace("/", "_")
+    extension = STORE_EXTENSION if fmt == STORE_FORMAT else archive_extension(fmt)
+    prefix = f"{new_timestamp()}_{safe_name}"
+
+    def archive(engine):
+        resume = engine.last_checkpoint()
+        # the entry count of a checkpoint only holds with the filter it was taken with
+        rules = WalkFilter.from_rules(resume.get('filters')) if resume else walk_filter
+        full_file = prefix + extension
+        # differential mode compares with the last full index of this acquisition
+        baseline = None
+        if resume and resume.get('baseline') or not resume and engine.options.get('baseline'):
+            baseline = index_baseline(engine.output_path,
+                                      full_file if fmt == STORE_FORMAT else files_index_name(full_file),
+                                      resume and resume.get('baseline'))
+            if resume and not baseline:
+                raise RuntimeError(f"baseline {resume['baseline']} of the interrupted acquisition is missing")
+        output_file = resume['artifact'] if resume else prefix + DELTA + extension if baseline else full_file
+        if resume:
+            engine.log(f"↷ Resuming {output_file} after {resume['entries']} entries")
+        if baseline:
+            engine.log(f"Comparing with {baseline[0]['name']}, only new and changed files are stored")
+        if rules:
+            engine.log(f"Filter: {rules.summary()}")
+        if fmt == STORE_FORMAT:
+            stats = acquire_store(engine, spec, output_file, threads=threads, resume=resume, baseline=baseline,
+                                  walk_filter=rules)
+            engine.log(f"✓ Stored → {STORE_DIR}/, index {output_file}: {stats.summary()}")
+        else:
+            stats = acquire(engine, spec, output_file, fmt=fmt, level=level, threads=threads, resume=resume,
+                            baseline=baseline, walk_filter=rules)
+            engine.log(f"✓ Archived → {output_file}, index {files_index_name(output_file)}: {stats.summary()}")
+        if stats.errors:
+            engine.log(f"⚠ {len(stats.errors)} file(s) could not be read, "
+                       f"see {sibling_path(output_file, 'stderr')}")
+
+    engine.submit_call(archive, f"Archive {name}")
+
+
+COLLECTORS = {
+    'system': queue_system_info,
+    'filevault': queue_filevault,
+    'processes': queue_processes,
+    'network': queue_network,
+    'users': queue_users,
+    'logs': queue_logs,
+}
+
+
+def queue_profile(engine, profile):
+    for steps in load_profile(profile).values():
+        queue_steps(engine, steps)
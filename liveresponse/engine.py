@@ -0,0 +1,532 @@
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from liveresponse.backend import LocalBackend
+from liveresponse.baseline import LineDiffWriter, diff_name, find_baseline
+from liveresponse.evidence import EVIDENCE_DB, EvidenceIndex
+from liveresponse.governor import DEFAULT_NICE, IOPOL_SCOPE_THREAD, Governor, set_io_policy
+from liveresponse.journal import Journal, interrupted_run, new_run_id
+from liveresponse.manifest import DEFAULT_DIGESTS, Manifest, MultiHasher
+from liveresponse.output import (COMPRESSIONS, DEFAULT_FSYNC, MB, WRITE_BUFFER, ArtifactWriter,
+                                 CompressingWriter, OutputMedium, Tee, compressed_name, copy_stream, sibling_path)
+from liveresponse.report import append_run, format_rate, rss_bytes, run_metrics, snapshot_metrics
+
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+PROGRESS_INTERVAL = 10.0
+# seconds between SIGTERM and SIGKILL when a command is stopped
+KILL_GRACE = 5.0
+
+
+class Job:
+    def __init__(self, description, output_file=None, cmd=None, func=None, coro=None, parser=None,
+                 timeout=None, optional=False, priority=0, volatile=False, compression=None):
+        self.description = description
+        self.output_file = output_file
+        self.cmd = cmd
+        self.parser = parser
+        self.func = func
+        self.coro = coro
+        self.kind = 'command' if cmd is not None else 'async' if coro is not None else 'call'
+        # seconds before a command or async job is stopped; call jobs cannot be interrupted
+        self.timeout = timeout
+        # failure is expected on some hosts and does not fail the collection
+        self.optional = optional
+        # higher priorities are started first
+        self.priority = priority
+        # part of the volatile snapshot launched together at the start of the run
+        self.volatile = volatile
+        # 'gzip' or 'zstd': the output is compressed while it is written
+        self.compression = compression
+        self.returncode = None
+        self.error = None
+        self.artifacts = []
+        self.bytes_written = 0
+        self.stderr_bytes = 0
+        self.peak_rss = None
+        self.indexed_rows = None
+        # manifest entry of the earlier full output this one is diffed against
+        self.baseline = None
+        self.skipped = False
+        self.queued_at = None
+        self.started_at = None
+        # when the command was spawned
+        self.launched_at = None
+        self.finished_at = None
+
+    @property
+    def stored_file(self):
+        # diffs are small and stay uncompressed
+        if self.baseline:
+            return diff_name(self.output_file)
+        return compressed_name(self.output_file, self.compression)
+
+
+_current_job = contextvars.ContextVar('current_job', default=None)
+
+
+def wait_child(proc):
+    _, status, rusage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return proc.returncode, rss_bytes(rusage.ru_maxrss)
+
+
+class CollectionEngine:
+    def __init__(self, output_path, max_workers=DEFAULT_WORKERS, log=print, digests=DEFAULT_DIGESTS,
+                 options=None, backend=None, medium=None, governor=None):
+        # medium, governor: shared by engines that run at the same time on
+        # one output volume (the GUI), built from the options otherwise
+        self.output_path = output_path
+        self.backend = backend or LocalBackend()
+        self.max_workers = max(1, int(max_workers))
+        self.log = log
+        # collector settings, e.g. {'log_slices': 8, 'log_style': 'ndjson', 'baseline': True}
+        self.options = dict(options or {})
+        self.governor = governor or Governor(self.max_workers,
+                                             adaptive=self.options.get('adaptive', True),
+                                             write_limit=self.options.get('write_limit'),
+                                             nice=self.options.get('nice', DEFAULT_NICE),
+                                             io_policy=self.options.get('io_policy', 'utility'))
+        self.active = 0
+        self._slots = None
+        # blocking pipe reads and wait4() calls, never shared with artifact writes
+        self._io_pool = None
+        self.manifest = Manifest(output_path, digests, chunk_size=self.options.get('chunk_size'))
+        # buffered, serialised writes and the fsync policy of the output volume
+        self.medium = medium or OutputMedium(fsync=self.options.get('fsync', DEFAULT_FSYNC),
+                                             buffer_size=self.options.get('write_buffer', WRITE_BUFFER))
+        # medium metrics when the run started, the report covers only this run
+        self.output_since = None
+        self.jobs = []
+        self.report = None
+        # launch / finish times and skew of the volatile snapshot, see report.snapshot_metrics
+        self.snapshot = None
+        # set once every snapshot job is ready to spawn its command
+        self._snapshot_gate = None
+        self.evidence = None
+        self.journal = None
+        self.run_id = None
+        # state of the interrupted run being resumed, see journal.py
+        self._resumed = None
+        # set by cancel(), possibly from another thread
+        self.cancelled = threading.Event()
+        self._loop = None
+        self._stop = None
+        self._children = set()
+
+    def submit_command(self, cmd, output_file, description, parser=None, timeout=None, optional=False,
+                       priority=0, volatile=False, compression=None):
+        # parser names an evidence.PARSERS entry that indexes the output while it is written
+        job = Job(description, output_file=output_file, cmd=cmd, parser=parser, timeout=timeout,
+                  optional=optional, priority=priority, volatile=volatile, compression=compression)
+        self.jobs.append(job)
+        return job
+
+    def submit_call(self, func, description, optional=False, priority=0):
+        # func runs in a worker thread and receives the engine
+        job = Job(description, func=func, optional=optional, priority=priority)
+        self.jobs.append(job)
+        return job
+
+    def submit_async(self, coro_func, description, timeout=None, optional=False, priority=0):
+        # coro_func(engine) is awaited on the engine's event loop
+        job = Job(description, coro=coro_func, timeout=timeout, optional=optional, priority=priority)
+        self.jobs.append(job)
+        return job
+
+    @property
+    def running(self):
+        return self._loop is not None
+
+    def cancel(self):
+        # stops the collection from any thread: queued jobs are dropped, the
+        # process groups of running commands are killed and artifact writes fail
+        self.cancelled.set()
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._stop.set)
+
+    def open_artifact(self, output_file, lazy=False, resume_at=None, compression=None):
+        # with compression the caller passes the compressed name, e.g. x.txt.gz
+        writer = ArtifactWriter(os.path.join(self.output_path, output_file), self.manifest,
+                                lazy=lazy, throttle=self.governor, resume_at=resume_at, cancel=self.cancelled,
+                                medium=self.medium)
+        job = _current_job.get()
+        if job is not None:
+            job.artifacts.append(writer)
+        if compression:
+            return CompressingWriter(writer, compression, MultiHasher(self.manifest.algorithms))
+        return writer
+
+    async def spawn(self, cmd, stdout, stderr, shell=True, timeout=None, preexec=True):
+        # streams the child's stdout/stderr into the writers, returns its exit status;
+        # the child leads a new process group so stopping it also stops what it started.
+        # Without preexec the child is spawned without running Python code in
+        # the fork, which is much quicker, and reniced afterwards.
+        loop = asyncio.get_running_loop()
+        proc = subprocess.Popen(self.backend.command(cmd) if shell else self.backend.argv(cmd),
+                                shell=shell, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                preexec_fn=self.governor.preexec if preexec else None, env=self.backend.env,
+                                start_new_session=True)
+        if not preexec:
+            self.governor.renice(proc.pid)
+        self._children.add(proc)
+        job = _current_job.get()
+        if job is not None and job.launched_at is None:
+            job.launched_at = time.time()
+        copies = [loop.run_in_executor(self._io_pool, copy_stream, proc.stdout, stdout),
+                  loop.run_in_executor(self._io_pool, copy_stream, proc.stderr, stderr)]
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.gather(*copies)), timeout)
+        except asyncio.TimeoutError:
+            self._kill_group(proc)
+            raise TimeoutError(f"timed out after {timeout:g}s")
+        except BaseException:
+            self._kill_group(proc)
+            raise
+        finally:
+            # a pipe is only closed once its reader is done with it
+            await asyncio.wait(copies, timeout=KILL_GRACE * 2)
+            for pipe, copy in zip((proc.stdout, proc.stderr), copies):
+                if copy.done():
+                    pipe.close()
+            returncode, peak_rss = await loop.run_in_executor(self._io_pool, wait_child, proc)
+            self._children.discard(proc)
+
+        if job is not None:
+            job.peak_rss = max(job.peak_rss or 0, peak_rss)
+            if not job.returncode:
+                job.returncode = returncode
+        return returncode
+
+    def _kill_group(self, proc):
+        # SIGTERM to the whole group, SIGKILL for whatever is left after KILL_GRACE
+        self._signal_group(proc, signal.SIGTERM)
+        asyncio.get_running_loop().call_later(KILL_GRACE, self._signal_group, proc, signal.SIGKILL)
+
+    def _signal_group(self, proc, signum):
+        if proc.returncode is not None:
+            return
+        try:
+            os.killpg(proc.pid, signum)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def checkpoint(self, **state):
+        # records partial progress of the current job, e.g. the last archived file
+        self.journal.append('checkpoint', run=self.run_id, job=_current_job.get().description, **state)
+
+    def last_checkpoint(self):
+        # progress the interrupted run made on the current job, None if there is none
+        if self._resumed is None:
+            return None
+        return self._resumed.checkpoints.get(_current_job.get().description)
+
+    def _resume(self, jobs):
+        state = self._resumed
+        pending = []
+        for job in jobs:
+            if job.description not in state.done:
+                pending.append(job)
+                artifact = state.started.get(job.description)
+                if artifact and job.description not in state.checkpoints:
+                    self._set_aside(artifact)
+                continue
+            job.skipped = True
+            for entry in state.done[job.description]:
+                self.manifest.entries.setdefault(entry['name'], entry)
+            self.log(f"↷ {job.description}: already collected by the interrupted run")
+        return pending
+
+    def _set_aside(self, artifact):
+        # output of a job that was cut off and will be collected again
+        names = [artifact, diff_name(artifact), sibling_path(artifact, 'stderr')] + \
+            [compressed_name(artifact, compression) for compression in COMPRESSIONS]
+        for name in names:
+            path = os.path.join(self.output_path, name)
+            if os.path.exists(path):
+                os.replace(path, path + '.partial')
+                self.log(f"⚠ {name} is incomplete, kept as {name}.partial")
+
+    def _journal_done(self, job):
+        entries = [self.manifest.entries.get(os.path.relpath(writer.path, self.output_path))
+                   for writer in job.artifacts]
+        self.journal.append('done', run=self.run_id, job=job.description,
+                            artifacts=[entry for entry in entries if entry])
+
+    def evidence_feed(self, job):
+        if not job.parser or not self.options.get('index', True):
+            return None
+        if self.evidence is None:
+            self.evidence = EvidenceIndex(os.path.join(self.output_path, EVIDENCE_DB))
+        return self.evidence.feed(job.parser, job.stored_file, job.cmd)
+
+    def _choose_baseline(self, job):
+        # command output is stored as a diff when an earlier full copy is on the volume
+        if job.cmd is not None and self.options.get('baseline'):
+            base = find_baseline(self.output_path, job.output_file)
+            if base and os.path.exists(os.path.join(self.output_path, base['name'])):
+                job.baseline = base
+
+    async def _run_command(self, job):
+        self._choose_baseline(job)
+        stdout = self.open_artifact(job.stored_file, compression=None if job.baseline else job.compression)
+        if job.baseline:
+            stdout = LineDiffWriter(stdout, os.path.join(self.output_path, job.baseline['name']), job.baseline)
+        stderr = self.open_artifact(sibling_path(job.output_file, 'stderr'), lazy=True)
+        feed = self.evidence_feed(job)
+        try:
+            snapshot = job.volatile and self._snapshot_gate is not None
+            if snapshot:
+                await self._snapshot_gate.wait()
+            job.returncode = await self.spawn(job.cmd, Tee(stdout, feed) if feed else stdout, stderr,
+                                              timeout=job.timeout, preexec=not snapshot)
+        finally:
+            # each one is closed even if closing another fails, e.g. after a cancel
+            with contextlib.ExitStack() as stack:
+                if feed:
+                    stack.callback(self._close_feed, job, feed)
+                stack.callback(stderr.close)
+                stdout.close()
+        job.stderr_bytes = stderr.bytes_written
+        if stderr.bytes_written:
+            job.artifacts.remove(stderr)
+
+    def _close_feed(self, job, feed):
+        job.indexed_rows = feed.close()
+        if feed.error:
+            self.log(f"⚠ {job.description}: indexing stopped: {feed.error}")
+
+    async def _run_call(self, job):
+        def call():
+            set_io_policy(self.governor.io_policy, IOPOL_SCOPE_THREAD)
+            job.func(self)
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, contextvars.copy_context().run, call)
+
+    async def _run_async(self, job):
+        try:
+            await asyncio.wait_for(job.coro(self), job.timeout)
+        except asyncio.TimeoutError:
+            if job.timeout is None:
+                raise
+            raise TimeoutError(f"timed out after {job.timeout:g}s")
+
+    async def _acquire_slot(self):
+        async with self._slots:
+            await self._slots.wait_for(lambda: self.active < self.governor.limit)
+            self.active += 1
+
+    async def _release_slot(self):
+        async with self._slots:
+            self.active -= 1
+            self._slots.notify_all()
+
+    def try_acquire_slot(self):
+        # an extra worker slot for a job that runs several commands at once,
+        # if one is free right now; hand it back with release_slot()
+        if self._slots is None or self.active >= self.governor.limit:
+            return False
+        self.active += 1
+        return True
+
+    async def release_slot(self):
+        await self._release_slot()
+
+    async def _govern(self, queue, jobs):
+        last_progress = time.monotonic()
+        while True:
+            await asyncio.sleep(self.governor.interval)
+            previous = self.governor.adjust(self.active, queue.qsize())
+            if self.governor.limit != previous:
+                self.log(f"Governor: {self.governor.status()}")
+                async with self._slots:
+                    self._slots.notify_all()
+            if time.monotonic() - last_progress >= PROGRESS_INTERVAL:
+                last_progress = time.monotonic()
+                done = sum(1 for job in jobs if job.finished_at)
+                self.log(f"Progress: {done}/{len(jobs)} jobs, {self.active} running, "
+                         f"{self.governor.bytes_written / MB:.1f} MB written, "
+                         f"{self.governor.rate / MB:.1f} MB/s")
+
+    def _finish(self, job):
+        job.bytes_written = sum(writer.bytes_written for writer in job.artifacts)
+        if job.error:
+            for writer in job.artifacts:
+                self.manifest.discard(writer.path)
+            return
+        rate = format_rate(job.bytes_written, job.finished_at - job.started_at)
+        if job.cmd is None:
+            # call and async jobs log their own result line
+            self.log(f"  {job.description}: {rate}")
+            return
+        note = f", stderr → {os.path.basename(sibling_path(job.output_file, 'stderr'))}" \
+            if job.stderr_bytes else ""
+        if job.indexed_rows is not None:
+            note += f", {job.indexed_rows} rows → {EVIDENCE_DB}"
+        if job.baseline:
+            note += f", diff against {job.baseline['name']}"
+        self.log(f"✓ {job.description} → {job.stored_file} ({rate}{note})")
+        if job.returncode:
+            self.log(f"⚠ {job.description} exited with status {job.returncode}")
+
+    async def _worker(self, queue):
+        # checks for a cancelled run as well: the task's own cancellation can
+        # be lost when the job fails with Cancelled at the same moment
+        while not self._stop.is_set():
+            job = await queue.get()
+            if self._stop.is_set():
+                queue.task_done()
+                break
+            await self._acquire_slot()
+            try:
+                await self._execute(job)
+            finally:
+                await self._release_slot()
+                queue.task_done()
+
+    async def _launch_snapshot(self, jobs):
+        # Volatile commands (processes, connections, sessions) are started all
+        # at once, outside the worker slots, so their views of the host line
+        # up. Every task first does its setup (journal, artifacts, evidence
+        # feed) and waits at the gate; once the gate opens the commands are
+        # spawned one right after the other. Everything else starts after.
+        self.log(f"Volatile snapshot: launching {len(jobs)} commands together")
+        self._snapshot_gate = asyncio.Event()
+        tasks = [asyncio.ensure_future(self._execute(job)) for job in jobs]
+        # the setup has no waits, so one pass of the loop takes every task to the gate
+        await asyncio.sleep(0)
+        self._snapshot_gate.set()
+        await asyncio.sleep(0)
+        return tasks
+
+    async def _finish_snapshot(self, jobs, tasks):
+        await asyncio.gather(*tasks)
+        self.snapshot = snapshot_metrics(jobs)
+        if not self.snapshot['commands']:
+            return
+        name = datetime.fromtimestamp(min(job.launched_at for job in jobs if job.launched_at)) \
+            .strftime("%Y%m%d_%H%M%S_volatile_snapshot.json")
+        try:
+            with self.open_artifact(name) as writer:
+                writer.write(json.dumps(self.snapshot, indent=2).encode())
+        except OSError as e:
+            self.log(f"✗ Volatile snapshot report: {str(e)}")
+            return
+        self.log(f"✓ Volatile snapshot → {name} ({self.snapshot['commands']} commands launched within "
+                 f"{self.snapshot['launch_skew_s'] * 1000:.0f} ms, finished within "
+                 f"{self.snapshot['finish_skew_s']:.1f}s of each other)")
+
+    async def _execute(self, job):
+        token = _current_job.set(job)
+        job.started_at = time.time()
+        self.journal.append('start', run=self.run_id, job=job.description, artifact=job.output_file)
+        try:
+            self.log(f"Executing: {job.description}...")
+            if job.cmd is not None:
+                await self._run_command(job)
+            elif job.coro is not None:
+                await self._run_async(job)
+            else:
+                await self._run_call(job)
+        except asyncio.CancelledError:
+            job.error = 'cancelled'
+            self.log(f"⏹ {job.description}: cancelled")
+            raise
+        except Exception as e:
+            job.error = str(e)
+            self.log(f"{'⚠' if job.optional else '✗'} Error in {job.description}: {str(e)}")
+        finally:
+            job.finished_at = time.time()
+            _current_job.reset(token)
+            self._finish(job)
+            if not job.error:
+                self._journal_done(job)
+
+    async def run(self):
+        queue = asyncio.Queue()
+        jobs, self.jobs = self.jobs, []
+        started_at = time.time()
+        self.output_since = self.medium.metrics()
+
+        self.journal = Journal(self.output_path)
+        self._resumed = interrupted_run(self.output_path) if self.options.get('resume') else None
+        self.run_id = self._resumed.run_id if self._resumed else new_run_id()
+        self.journal.append('run', run=self.run_id, resumed=self._resumed is not None,
+                            jobs=[job.description for job in jobs])
+        pending = self._resume(jobs) if self._resumed else jobs
+        # most volatile first; sorted() keeps the submission order within a priority
+        pending = sorted(pending, key=lambda job: -job.priority)
+        for job in pending:
+            job.queued_at = started_at
+            if not job.volatile:
+                queue.put_nowait(job)
+        volatile = [job for job in pending if job.volatile]
+
+        self._slots = asyncio.Condition()
+        self._io_pool = ThreadPoolExecutor(max_workers=self.max_workers * 3 + 2,
+                                           thread_name_prefix='engine-io')
+        self._stop = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        if self.cancelled.is_set():
+            self._stop.set()
+        started = time.monotonic()
+        snapshot = await self._launch_snapshot(volatile) if volatile else []
+        if snapshot:
+            snapshot = [asyncio.ensure_future(self._finish_snapshot(volatile, snapshot))] + snapshot
+        workers = [asyncio.ensure_future(self._worker(queue))
+                   for _ in range(min(self.max_workers, queue.qsize()) or 1)]
+        workers.append(asyncio.ensure_future(self._govern(queue, pending)))
+        workers.extend(snapshot)
+        completed = False
+        try:
+            # completion barrier: every artifact is closed once join() returns
+            joined = asyncio.gather(queue.join(), *snapshot[:1])
+            stop = asyncio.ensure_future(self._stop.wait())
+            await asyncio.wait([joined, stop], return_when=asyncio.FIRST_COMPLETED)
+            completed = joined.done()
+            joined.cancel()
+            stop.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await asyncio.gather(joined, stop, return_exceptions=True)
+            if not completed:
+                self.log(f"⏹ Collection cancelled, stopping {self.active} running job(s)")
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._loop = None
+            for job in pending:
+                if job.started_at is None:
+                    job.error = 'cancelled'
+            self._io_pool.shutdown(wait=False)
+            try:
+                self.medium.finish()
+            except OSError as e:
+                self.log(f"✗ Sync of the output volume failed: {str(e)}")
+            self.log(f"Output: {self.medium.summary(since=self.output_since)}")
+            if self.evidence is not None:
+                self.evidence.close()
+                self.evidence = None
+                self.manifest.hash_file(os.path.join(self.output_path, EVIDENCE_DB))
+            self.manifest.save()
+            self.report = run_metrics(self, jobs, started_at, time.time())
+            append_run(self.output_path, self.report)
+            if completed:
+                self.journal.append('end', run=self.run_id)
+            self.journal.close()
+        return jobs, time.monotonic() - started
+
+    def run_sync(self):
+        return asyncio.run(self.run())
@@ -0,0 +1,384 @@
+import os
+import re
+import sqlite3
+import threading
+
+from liveresponse.baseline import expand_diff, is_diff
+from liveresponse.output import open_stored, strip_compression
+
+
+EVIDENCE_DB = "evidence.db"
+BATCH_ROWS = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    artifact TEXT NOT NULL,
+    collection TEXT,
+    command TEXT,
+    rows INTEGER,
+    skipped INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS processes (
+    source_id INTEGER, user TEXT, pid INTEGER, cpu REAL, mem REAL, vsz INTEGER, rss INTEGER,
+    tty TEXT, stat TEXT, started TEXT, time TEXT, command TEXT
+);
+CREATE TABLE IF NOT EXISTS services (
+    source_id INTEGER, pid INTEGER, status INTEGER, label TEXT
+);
+CREATE TABLE IF NOT EXISTS open_files (
+    source_id INTEGER, command TEXT, pid INTEGER, user TEXT, fd TEXT, type TEXT,
+    device TEXT, size_off TEXT, node TEXT, path TEXT
+);
+CREATE TABLE IF NOT EXISTS connections (
+    source_id INTEGER, command TEXT, pid INTEGER, user TEXT, fd TEXT, family TEXT, protocol TEXT,
+    local_addr TEXT, local_port, remote_addr TEXT, remote_port, state TEXT
+);
+CREATE TABLE IF NOT EXISTS sockets (
+    source_id INTEGER, protocol TEXT, recv_q INTEGER, send_q INTEGER,
+    local_addr TEXT, local_port, remote_addr TEXT, remote_port, state TEXT
+);
+CREATE TABLE IF NOT EXISTS kexts (
+    source_id INTEGER, idx INTEGER, refs INTEGER, address TEXT, size TEXT, wired TEXT,
+    name TEXT, version TEXT, uuid TEXT, linked_against TEXT
+);
+CREATE VIEW IF NOT EXISTS connection_owners AS
+    SELECT c.*, p.user AS process_user, p.command AS process_command
+    FROM connections c
+    JOIN sources cs ON cs.id = c.source_id
+    LEFT JOIN sources ps ON ps.collection = cs.collection AND ps.kind = 'ps'
+    LEFT JOIN processes p ON p.source_id = ps.id AND p.pid = c.pid;
+"""
+
+# created once the bulk inserts are done, maintaining them row by row is slower
+INDEXES = """
+CREATE INDEX IF NOT EXISTS processes_pid ON processes (pid);
+CREATE INDEX IF NOT EXISTS services_pid ON services (pid);
+CREATE INDEX IF NOT EXISTS open_files_pid ON open_files (pid);
+CREATE INDEX IF NOT EXISTS open_files_path ON open_files (path);
+CREATE INDEX IF NOT EXISTS connections_pid ON connections (pid);
+CREATE INDEX IF NOT EXISTS connections_remote ON connections (remote_addr, remote_port);
+CREATE INDEX IF NOT EXISTS connections_local_port ON connections (local_port);
+CREATE INDEX IF NOT EXISTS sockets_remote ON sockets (remote_addr, remote_port);
+CREATE INDEX IF NOT EXISTS sockets_local_port ON sockets (local_port);
+CREATE INDEX IF NOT EXISTS kexts_name ON kexts (name);
+"""
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _port(value):
+    # lsof without -P prints service names, those are kept as text
+    if value in (None, '', '*'):
+        return None
+    return int(value) if value.isdigit() else value
+
+
+class PsParser:
+    table = 'processes'
+
+    def header(self, line):
+        return line.startswith('USER')
+
+    def parse(self, line):
+        fields = line.split(None, 10)
+        if len(fields) < 11:
+            return None
+        user, pid, cpu, mem, vsz, rss, tty, stat, started, time, command = fields
+        return (user, int(pid), float(cpu), float(mem), int(vsz), int(rss), tty, stat, started, time,
+                command.rstrip('\n'))
+
+
+class LaunchctlParser:
+    table = 'services'
+
+    def header(self, line):
+        return line.startswith('PID')
+
+    def parse(self, line):
+        fields = line.rstrip('\n').split('\t')
+        if len(fields) != 3:
+            return None
+        return _int(fields[0]), _int(fields[1]), fields[2]
+
+
+class LsofParser:
+    table = 'open_files'
+    # numeric columns are right-aligned under their heading, the rest left-aligned
+    RIGHT_ALIGNED = {'PID', 'DEVICE', 'SIZE/OFF', 'NODE'}
+
+    def __init__(self):
+        self.columns = None
+        self.name_start = None
+
+    def header(self, line):
+        if not line.startswith('COMMAND'):
+            return False
+        self.columns = [(match.group(), match.start(), match.end())
+                        for match in re.finditer(r'\S+', line.rstrip('\n'))]
+        self.name_start = self.columns[-1][1]
+        self.columns = self.columns[:-1]
+        return True
+
+    def split(self, line):
+        line = line.rstrip('\n')
+        fields = line.split(None, len(self.columns))
+        if len(fields) == len(self.columns) + 1 and len(line) - len(fields[-1]) == self.name_start:
+            return fields
+        if len(line) > self.name_start and line[self.name_start - 1] == ' ':
+            # empty cells (e.g. SIZE/OFF of a pipe) are placed by column position
+            values = dict.fromkeys(column for column, _, _ in self.columns)
+            for match in re.finditer(r'\S+', line[:self.name_start]):
+                column = min(self.columns, key=lambda c: abs(match.end() - c[2]) if c[0] in self.RIGHT_ALIGNED
+                             else abs(match.start() - c[1]))[0]
+                if values[column] is not None:
+                    break
+                values[column] = match.group()
+            else:
+                return [values[column] for column, _, _ in self.columns] + [line[self.name_start:]]
+        return fields if len(fields) == len(self.columns) + 1 else None
+
+    def parse(self, line):
+        fields = self.split(line)
+        if fields is None:
+            return None
+        command, pid, user, fd, type_, device, size_off, node, name = fields
+        return command, _int(pid), user, fd, type_, device, size_off, node, name
+
+
+class LsofNetworkParser(LsofParser):
+    table = 'connections'
+    STATE = re.compile(r'\s*\(([A-Z_0-9]+)\)$')
+
+    def parse(self, line):
+        fields = self.split(line)
+        if fields is None:
+            return None
+        command, pid, user, fd, family, _, _, protocol, name = fields
+        state = self.STATE.search(name)
+        if state:
+            name = name[:state.start()]
+        local, _, remote = name.partition('->')
+        local_addr, local_port = self.endpoint(local)
+        remote_addr, remote_port = self.endpoint(remote)
+        return (command, _int(pid), user, fd, family, protocol, local_addr, local_port,
+                remote_addr, remote_port, state.group(1) if state else None)
+
+    @staticmethod
+    def endpoint(text):
+        if not text:
+            return None, None
+        address, _, port = text.rpartition(':')
+        if not address:
+            return text, None
+        return address.strip('[]'), _port(port)
+
+
+class NetstatParser:
+    table = 'sockets'
+
+    def header(self, line):
+        return line.startswith('Proto')
+
+    def parse(self, line):
+        fields = line.split()
+        if len(fields) < 5 or not fields[0].startswith(('tcp', 'udp')):
+            return None
+        protocol, recv_q, send_q, local, remote = fields[:5]
+        local_addr, local_port = self.endpoint(local)
+        remote_addr, remote_port = self.endpoint(remote)
+        return (protocol, _int(recv_q), _int(send_q), local_addr, local_port, remote_addr, remote_port,
+                fields[5] if len(fields) > 5 else None)
+
+    @staticmethod
+    def endpoint(text):
+        # macOS netstat separates the port with a dot: 10.0.0.1.443, fe80::1%lo0.123, *.*
+        address, _, port = text.rpartition('.')
+        return (address or text), _port(port)
+
+
+class KextstatParser:
+    table = 'kexts'
+    ROW = re.compile(r'\s*(\d+)\s+(\d+)\s+(0x[0-9a-f]+)\s+(0x[0-9a-f]+)\s+(0x[0-9a-f]+)\s+(\S+)\s+'
+                     r'\(([^)]*)\)\s+(\S+)(?:\s+<([^>]*)>)?')
+
+    def header(self, line):
+        return line.startswith('Index')
+
+    def parse(self, line):
+        match = self.ROW.match(line)
+        if not match:
+            return None
+        idx, refs, address, size, wired, name, version, uuid, linked = match.groups()
+        return int(idx), int(refs), address, size, wired, name, version, uuid, linked
+
+
+PARSERS = {
+    'ps': PsParser,
+    'launchctl': LaunchctlParser,
+    'lsof': LsofParser,
+    'lsof_i': LsofNetworkParser,
+    'netstat': NetstatParser,
+    'kextstat': KextstatParser,
+}
+
+# artifact name suffixes written by the collectors, used to index older collections
+ARTIFACT_KINDS = {
+    '_processes.txt': 'ps',
+    '_services.txt': 'launchctl',
+    '_open_files.txt': 'lsof',
+    '_network_connections.txt': 'lsof_i',
+    '_netstat.txt': 'netstat',
+    '_kextstat.txt': 'kextstat',
+}
+
+
+class LineFeed:
+    # receives the raw command output as it is written and inserts parsed rows
+    # in batches; a parser failure never affects the artifact itself
+    def __init__(self, index, source_id, parser):
+        self.index = index
+        self.source_id = source_id
+        self.parser = parser
+        self.rows = 0
+        self.skipped = 0
+        self.error = None
+        self._batch = []
+        self._partial = b''
+        self._in_header = True
+
+    def write(self, data):
+        if self.error:
+            return
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()
+        try:
+            for line in lines:
+                self._line(line.decode('utf-8', 'replace'))
+        except Exception as e:
+            self.error = str(e)
+
+    def _line(self, line):
+        if self._in_header:
+            # everything up to the column header (titles, blank lines) is ignored
+            self._in_header = not self.parser.header(line)
+            return
+        try:
+            row = self.parser.parse(line)
+        except ValueError:
+            row = None
+        if row is None:
+            self.skipped += bool(line.strip())
+            return
+        self._batch.append(row)
+        if len(self._batch) >= BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        self.index.insert(self.parser.table, self.source_id, self._batch)
+        self.rows += len(self._batch)
+        self._batch = []
+
+    def close(self):
+        try:
+            if self._partial and not self.error:
+                self._line(self._partial.decode('utf-8', 'replace'))
+            if self._batch and not self.error:
+                self._flush()
+        except Exception as e:
+            self.error = str(e)
+        self.index.finish(self.source_id, self.rows, self.skipped, self.error)
+        return self.rows
+
+
+class EvidenceIndex:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # derived data that can be rebuilt from the raw artifacts, so the
+        # rollback journal is kept but not synced after every batch
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.executescript(SCHEMA)
+        self._columns = {}
+
+    def feed(self, kind, artifact, command=None):
+        match = re.match(r'(\d{8}_\d{6})_', os.path.basename(artifact))
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO sources (kind, artifact, collection, command) VALUES (?, ?, ?, ?)",
+                (kind, artifact, match.group(1) if match else None, command))
+        return LineFeed(self, cursor.lastrowid, PARSERS[kind]())
+
+    def insert(self, table, source_id, rows):
+        with self._lock:
+            if table not in self._columns:
+                self._columns[table] = len(self._db.execute(f"SELECT * FROM {table} LIMIT 0").description)
+            placeholders = ', '.join('?' * self._columns[table])
+            # one transaction per batch
+            with self._db:
+                self._db.executemany(f"INSERT INTO {table} VALUES ({placeholders})",
+                                     ((source_id,) + row for row in rows))
+
+    def finish(self, source_id, rows, skipped, error=None):
+        with self._lock, self._db:
+            self._db.execute("UPDATE sources SET rows = ?, skipped = ?, error = ? WHERE id = ?",
+                             (rows, skipped, error, source_id))
+
+    def indexed(self):
+        with self._lock:
+            return {artifact for artifact, in self._db.execute("SELECT artifact FROM sources")}
+
+    def close(self):
+        with self._lock:
+            self._db.executescript(INDEXES)
+            self._db.execute("ANALYZE")
+            self._db.close()
+
+
+def index_artifact(index, path, kind, chunk_size=1024 * 1024):
+    feed = index.feed(kind, os.path.basename(path))
+    if is_diff(path):
+        # differential output is parsed as the full output it expands to
+        try:
+            expand_diff(path, feed)
+        except (OSError, ValueError) as e:
+            feed.error = feed.error or str(e)
+        feed.close()
+        return feed
+    with open_stored(path) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            feed.write(chunk)
+    feed.close()
+    return feed
+
+
+def index_collection(output_path, log=print):
+    # parses raw artifacts from earlier runs that are not in the index yet
+    index = EvidenceIndex(os.path.join(output_path, EVIDENCE_DB))
+    try:
+        done = index.indexed()
+        feeds = []
+        for name in sorted(os.listdir(output_path)):
+            full_name = strip_compression(name.replace('.diff.', '.') if is_diff(name) else name)
+            kind = next((kind for suffix, kind in ARTIFACT_KINDS.items() if full_name.endswith(suffix)), None)
+            if kind is None or name in done:
+                continue
+            feed = index_artifact(index, os.path.join(output_path, name), kind)
+            log(f"✓ {name} → {feed.parser.table} ({feed.rows} rows, {feed.skipped} skipped)")
+            if feed.error:
+                log(f"⚠ {name}: {feed.error}")
+            feeds.append(feed)
+        return feeds
+    finally:
+        index.close()
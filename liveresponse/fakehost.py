@@ -0,0 +1,284 @@
+import json
+import os
+import plistlib
+import re
+import sys
+from datetime import datetime, timedelta
+
+# Synthetic stand-ins for macOS commands so the engine can be exercised on
+# Linux. Output is deterministic for a given set of arguments; the amount
+# of output grows with FAKEHOST_SCALE.
+
+LOG_RATE_ENV = 'FAKEHOST_LOG_RATE'
+SCALE_ENV = 'FAKEHOST_SCALE'
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+LOG_HEADER = "Timestamp                       Thread     Type        Activity             PID    TTL  \n"
+BATCH = 4096
+
+
+def scale():
+    return float(os.environ.get(SCALE_ENV, '1'))
+
+
+def scaled(count):
+    return max(1, int(count * scale()))
+
+
+def write_lines(out, lines):
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= BATCH:
+            out.write(''.join(buffer).encode())
+            buffer = []
+    out.write(''.join(buffer).encode())
+
+
+def _parse_window(args):
+    options = {}
+    i = 0
+    while i < len(args):
+        if args[i].startswith('--') and i + 1 < len(args):
+            options[args[i][2:]] = args[i + 1]
+            i += 2
+        else:
+            i += 1
+    now = datetime.now().replace(microsecond=0)
+    if 'last' in options:
+        match = re.fullmatch(r'(\d+)([smhd]?)', options['last'])
+        unit = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, '': 1}[match.group(2)]
+        return now - timedelta(seconds=int(match.group(1)) * unit), now, options
+    start = datetime.strptime(options['start'], TIME_FORMAT) if 'start' in options else now - timedelta(days=1)
+    end = datetime.strptime(options['end'], TIME_FORMAT) if 'end' in options else now
+    return start, end, options
+
+
+def fake_log(args, out):
+    if not args or args[0] != 'show':
+        sys.stderr.write("log: only 'show' is emulated\n")
+        return 64
+    start, end, options = _parse_window(args[1:])
+    style = options.get('style', 'default')
+    rate = int(os.environ.get(LOG_RATE_ENV, '0')) or scaled(1)
+    subsystem = 'com.apple.security' if 'predicate' in options else 'com.apple.fake'
+
+    def lines():
+        if style in ('default', 'compact'):
+            yield LOG_HEADER
+        # json is a single array, ndjson one object per line
+        separator = "[\n"
+        # --end is exclusive here so adjacent slices never repeat a second
+        for second in range(int((end - start).total_seconds())):
+            moment = start + timedelta(seconds=second)
+            epoch = int(moment.timestamp())
+            for n in range(rate):
+                pid = 100 + (epoch + n) % 400
+                message = f"fake event {epoch}.{n} from pid {pid}"
+                stamp = moment.strftime(TIME_FORMAT) + f".{n:06d}+0000"
+                event = {'timestamp': stamp, 'processID': pid, 'subsystem': subsystem,
+                         'messageType': 'Default', 'eventMessage': message}
+                if style == 'json':
+                    yield separator + json.dumps(event)
+                    separator = ",\n"
+                elif style == 'ndjson':
+                    yield json.dumps(event) + "\n"
+                else:
+                    yield (f"{stamp} 0x{epoch % 65536:x}    Default     0x0                  "
+                           f"{pid:<6} 0    fakeproc: ({subsystem}) {message}\n")
+        if style == 'json':
+            yield "[\n]\n" if separator == "[\n" else "\n]\n"
+
+    write_lines(out, lines())
+    return 0
+
+
+def _process(i):
+    user = ('root', '_windowserver', 'alice', 'bob')[i % 4]
+    return user, 100 + i, f"/System/Library/Fake/proc{i % 97}.app/Contents/MacOS/proc{i % 97}"
+
+
+def fake_ps(args, out):
+    def lines():
+        yield "USER               PID  %CPU %MEM      VSZ    RSS   TT  STAT STARTED      TIME COMMAND\n"
+        for i in range(scaled(600)):
+            user, pid, command = _process(i)
+            yield (f"{user:<16} {pid:>5} {i % 10:>5}.0 {i % 5:>4}.1 {400000 + i:>8} {20000 + i:>6}   ??  "
+                   f"Ss   9:00AM   0:0{i % 10}.00 {command}\n")
+    write_lines(out, lines())
+    return 0
+
+
+def fake_lsof(args, out):
+    network = '-i' in args
+
+    def lines():
+        # lsof pads every column to its widest value
+        yield f"{'COMMAND':<9} {'PID':>5} {'USER':<13} {'FD':<4} {'TYPE':<4} {'DEVICE':>18} {'SIZE/OFF':>8} {'NODE':>8} NAME\n"
+        for i in range(scaled(2000 if network else 200000)):
+            user, pid, command = _process(i // 50)
+            name = os.path.basename(command)[:9]
+            if network:
+                yield (f"{name:<9} {pid:>5} {user:<13} {f'{i % 30}u':<4} IPv4 0x{i:016x} {'0t0':>8} {'TCP':>8} "
+                       f"10.0.0.{i % 250}:{49152 + i % 16000}->17.253.{i % 250}.{i % 200}:443 (ESTABLISHED)\n")
+            else:
+                yield (f"{name:<9} {pid:>5} {user:<13} {f'{i % 30}r':<4} REG  {'1,18':>18} {i * 7 % 999999:>8} "
+                       f"{1000000 + i:>8} /System/Library/Fake/file{i}.dylib\n")
+    write_lines(out, lines())
+    return 0
+
+
+def fake_netstat(args, out):
+    routes = '-r' in args
+
+    def lines():
+        if routes:
+            yield "Routing tables\n\nInternet:\nDestination        Gateway            Flags           Netif Expire\n"
+            for i in range(50):
+                yield f"10.0.{i}.0/24        link#{i % 8}            UCS               en0      !\n"
+            return
+        yield "Active Internet connections (including servers)\n"
+        yield "Proto Recv-Q Send-Q  Local Address          Foreign Address        (state)\n"
+        for i in range(scaled(1000)):
+            yield (f"tcp4       0      0  10.0.0.{i % 250}.{49152 + i % 16000:<6} "
+                   f"17.253.{i % 250}.{i % 200}.443     ESTABLISHED\n")
+    write_lines(out, lines())
+    return 0
+
+
+def fake_launchctl(args, out):
+    write_lines(out, ["PID\tStatus\tLabel\n"] +
+                [f"{100 + i if i % 3 else '-'}\t0\tcom.apple.fake.service{i}\n" for i in range(800)])
+    return 0
+
+
+def fake_kextstat(args, out):
+    write_lines(out, ["Index Refs Address            Size       Wired      Name (Version) UUID <Linked Against>\n"] +
+                [f"{i:>5} {i % 9:>4} 0xffffff7f8{i:07x} 0x{i * 64:x}     0x{i * 64:x}     "
+                 f"com.apple.fake.kext{i} (1.0.{i}) {i:08X}-0000-0000-0000-000000000000 <1 2 3>\n"
+                 for i in range(300)])
+    return 0
+
+
+def fake_system_profiler(args, out):
+    types = [arg for arg in args if arg.startswith('SP')] or \
+        ['SPHardwareDataType', 'SPApplicationsDataType'] + [f"SPFake{i}DataType" for i in range(38)]
+    if '-listDataTypes' in args:
+        write_lines(out, ["Available Datatypes:\n"] + [f"{name}\n" for name in types])
+        return 0
+    if '-xml' in args:
+        plist = [{'_dataType': name, '_timeStamp': datetime(2025, 10, 5, 9, 0),
+                  '_items': [{'_name': f"item{i}", 'value': i} for i in range(scaled(50))]}
+                 for name in types]
+        out.write(plistlib.dumps(plist))
+        return 0
+
+    def lines():
+        for name in types:
+            yield f"{name[2:-8]}:\n\n"
+            for i in range(scaled(5000 // len(types) + 1)):
+                yield f"      Fake Property {i}: value {i}\n"
+            yield "\n"
+    write_lines(out, lines())
+    return 0
+
+
+def fake_small(text):
+    def command(args, out):
+        out.write(text.encode())
+        return 0
+    return command
+
+
+def fake_nvram(args, out):
+    out.write(plistlib.dumps({f"fake-var-{i}": f"value{i}".encode() for i in range(40)}))
+    return 0
+
+
+def fake_last(args, out):
+    write_lines(out, [f"alice     ttys00{i % 10}                   Mon Oct  5 09:{i % 60:02d}   still logged in\n"
+                      for i in range(scaled(1000))] + ["\nwtmp begins Mon Oct  5 09:00\n"])
+    return 0
+
+
+def fake_diskutil(args, out):
+    if args[:2] == ['list', '-plist']:
+        fixture = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               'fixtures', 'diskutil_list.plist')
+        with open(fixture, 'rb') as f:
+            out.write(f.read())
+        return 0
+    out.write(b"APFS Containers (2 found)\n|\n+-- Container disk3 FAKE\n    ====================\n")
+    return 0
+
+
+COMMANDS = {
+    'log': fake_log,
+    'ps': fake_ps,
+    'lsof': fake_lsof,
+    'netstat': fake_netstat,
+    'launchctl': fake_launchctl,
+    'kextstat': fake_kextstat,
+    'system_profiler': fake_system_profiler,
+    'nvram': fake_nvram,
+    'diskutil': fake_diskutil,
+    'fdesetup': lambda args, out: fake_small(
+        "FileVault is On.\n" if args[:1] == ['status'] else "alice,00000000-0000-0000-0000-000000000501\n")(args, out),
+    'sharing': fake_small("No share point records.\n"),
+    'who': fake_small("alice    console  Oct  5 09:00\nalice    ttys000  Oct  5 09:01\n"),
+    'last': fake_last,
+}
+
+
+def build_tree(root, users=3, files_per_dir=None, file_size=64 * 1024, system_log_size=None):
+    # /Users/<name>/{Documents,Desktop,...}, shell histories and /var/log/system.log
+    files_per_dir = files_per_dir or scaled(20)
+    system_log_size = system_log_size or scaled(10 * 1024 * 1024)
+    line = b"Oct  5 09:00:00 fakehost kernel[0]: synthetic system.log line for benchmarking\n"
+    shared = bytes(range(256)) * (file_size // 256 + 1)
+
+    for u in range(users):
+        home = os.path.join(root, 'Users', f"user{u}")
+        for sub in ('Documents', 'Desktop', 'Downloads', 'Library/Mail', 'Library/Messages',
+                    'Library/Safari', 'Library/Caches/com.apple.fake'):
+            directory = os.path.join(home, sub)
+            os.makedirs(directory, exist_ok=True)
+            for i in range(files_per_dir):
+                path = os.path.join(directory, f"file{i}.dat")
+                if os.path.exists(path):
+                    continue
+                with open(path, 'wb') as f:
+                    # caches are identical across users, the rest is unique
+                    if 'Caches' in sub:
+                        f.write(shared[:file_size])
+                    else:
+                        f.write(f"{u}/{sub}/{i}\n".encode() * (file_size // 16 + 1))
+        with open(os.path.join(home, '.zsh_history'), 'wb') as f:
+            f.write(b"".join(f": 1700000000:0;ls -la /tmp/{i}\n".encode() for i in range(scaled(5000))))
+
+    log_dir = os.path.join(root, 'var', 'log')
+    os.makedirs(log_dir, exist_ok=True)
+    log_path = os.path.join(log_dir, 'system.log')
+    if not os.path.exists(log_path) or os.path.getsize(log_path) != system_log_size:
+        with open(log_path, 'wb') as f:
+            written = 0
+            block = line * 4096
+            while written < system_log_size:
+                chunk = block[:system_log_size - written]
+                f.write(chunk)
+                written += len(chunk)
+    return root
+
+
+def main(argv):
+    if not argv or argv[0] not in COMMANDS:
+        sys.stderr.write(f"fakehost: unknown command {argv[:1]}\n")
+        return 127
+    out = sys.stdout.buffer
+    try:
+        return COMMANDS[argv[0]](argv[1:], out)
+    except BrokenPipeError:
+        return 141
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,174 @@
+import ctypes
+import ctypes.util
+import os
+import sys
+import threading
+import time
+
+from liveresponse.output import MB
+
+
+DEFAULT_NICE = 10
+DEFAULT_INTERVAL = 2.0
+# 1-minute load average per core above which concurrency is reduced
+DEFAULT_MAX_LOAD = 1.5
+
+# macOS <sys/resource.h>
+IOPOL_TYPE_DISK = 0
+IOPOL_SCOPE_PROCESS = 0
+IOPOL_SCOPE_THREAD = 1
+IOPOL_THROTTLE = 3
+IOPOL_UTILITY = 4
+IO_POLICIES = {'utility': IOPOL_UTILITY, 'throttle': IOPOL_THROTTLE}
+
+# Linux ioprio_set(2)
+_IOPRIO_SYSCALL = {'x86_64': 251, 'aarch64': 30, 'arm64': 30}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_BE = 2
+_IOPRIO_CLASS_IDLE = 3
+
+_libc = None
+
+
+def libc():
+    # the C library, loaded once; also used for the xattr calls of walker.py
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    return _libc
+
+
+def set_io_policy(policy, scope=IOPOL_SCOPE_PROCESS):
+    if not policy:
+        return False
+    try:
+        c = libc()
+        if sys.platform == 'darwin':
+            return c.setiopolicy_np(IOPOL_TYPE_DISK, scope, IO_POLICIES[policy]) == 0
+        if sys.platform.startswith('linux') and scope == IOPOL_SCOPE_PROCESS:
+            number = _IOPRIO_SYSCALL.get(os.uname().machine)
+            if number is None:
+                return False
+            value = (_IOPRIO_CLASS_IDLE << 13) if policy == 'throttle' else (_IOPRIO_CLASS_BE << 13) | 7
+            return c.syscall(number, _IOPRIO_WHO_PROCESS, 0, value) == 0
+    except (OSError, AttributeError, KeyError):
+        pass
+    return False
+
+
+def lower_priority(nice=DEFAULT_NICE, io_policy='utility'):
+    # used as preexec_fn / pool initializer, so it must never raise
+    try:
+        if nice:
+            os.nice(nice)
+    except OSError:
+        pass
+    set_io_policy(io_policy)
+
+
+class TokenBucket:
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate
+        self.capacity = burst or (rate or 0)
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount):
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class Governor:
+    # hill-climbs the number of concurrent jobs on measured write throughput
+    # and backs off when the host is overloaded
+    def __init__(self, max_workers, min_workers=1, adaptive=True, write_limit=None,
+                 nice=DEFAULT_NICE, io_policy='utility', max_load=DEFAULT_MAX_LOAD,
+                 interval=DEFAULT_INTERVAL):
+        self.max_workers = max(1, max_workers)
+        self.min_workers = max(1, min(min_workers, self.max_workers))
+        self.adaptive = adaptive
+        self.limit = max(self.min_workers, self.max_workers // 2) if adaptive else self.max_workers
+        self.bucket = TokenBucket(write_limit * MB if write_limit else None,
+                                  burst=int(write_limit * MB / 4) if write_limit else None)
+        self.nice = nice
+        self.io_policy = io_policy
+        if io_policy:
+            # loaded once here: find_library spawns processes and must not
+            # run in a forked child, where preexec() sets the policy
+            try:
+                libc()
+            except OSError:
+                pass
+        self.max_load = max_load
+        self.interval = interval
+        self.bytes_written = 0
+        self.rate = 0.0
+        self.load = 0.0
+        self._lock = threading.Lock()
+        self._last_bytes = 0
+        self._last_time = time.monotonic()
+        self._last_rate = 0.0
+        self._direction = 1
+
+    def consume(self, amount):
+        with self._lock:
+            self.bytes_written += amount
+        self.bucket.consume(amount)
+
+    def host_load(self):
+        try:
+            return os.getloadavg()[0] / (os.cpu_count() or 1)
+        except OSError:
+            return 0.0
+
+    def sample(self):
+        now = time.monotonic()
+        with self._lock:
+            written = self.bytes_written
+        elapsed = now - self._last_time
+        self.rate = (written - self._last_bytes) / elapsed if elapsed > 0 else 0.0
+        self._last_bytes, self._last_time = written, now
+        self.load = self.host_load()
+        return self.rate, self.load
+
+    def adjust(self, active, pending):
+        rate, load = self.sample()
+        previous = self.limit
+        if not self.adaptive:
+            return previous
+        if load > self.max_load:
+            self.limit = max(self.min_workers, self.limit - 1)
+            self._direction = -1
+        elif pending or active >= self.limit:
+            if rate < self._last_rate * 0.9:
+                # the last step made things worse: reverse
+                self._direction = -self._direction
+            self.limit = min(self.max_workers, max(self.min_workers, self.limit + self._direction))
+        self._last_rate = rate
+        return previous
+
+    def preexec(self):
+        lower_priority(self.nice, self.io_policy)
+
+    def renice(self, pid):
+        # lowers a child that was started without preexec; the disk I/O
+        # policy can only be set from inside the process and is left alone
+        if not self.nice:
+            return
+        try:
+            os.setpriority(os.PRIO_PROCESS, pid, os.getpriority(os.PRIO_PROCESS, 0) + self.nice)
+        except OSError:
+            pass
+
+    def status(self):
+        return f"{self.limit} workers, {self.rate / MB:.1f} MB/s written, load {self.load:.2f}/core"
@@ -0,0 +1,867 @@
+import tkinter as tk
+from tkinter import ttk, scrolledtext, messagebox
+import subprocess
+import os
+import sys
+import threading
+from datetime import datetime
+
+from liveresponse.archive import DEFAULT_LEVEL, DEFAULT_THREADS, LEVELS, clamp_level
+from liveresponse.binaries import deploy
+from liveresponse.collectors import (ACQUISITION_FORMATS, ACQUISITION_TARGETS, queue_acquisition, queue_filevault,
+                                     queue_logs, queue_network, queue_processes, queue_profile,
+                                     queue_system_info, queue_users)
+from liveresponse.engine import CollectionEngine, DEFAULT_WORKERS
+from liveresponse.governor import IOPOL_SCOPE_THREAD, Governor, set_io_policy
+from liveresponse.journal import interrupted_run
+from liveresponse.logsink import LogSink
+from liveresponse.manifest import Manifest, PREPARATION_LOG, RUN_REPORT, TERMINAL_OUTPUT_LOG, TRUSTED_TERMINAL_LOG
+from liveresponse.merkle import DEFAULT_CHUNK_SIZE
+from liveresponse.output import MB
+from liveresponse.volumes import VolumeDiscovery
+from liveresponse.walker import WalkFilter, parse_time
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ForensicUSBTool:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Forensic USB Tool - Trusted Binaries")
+        self.root.geometry("950x750")
+        
+        style = ttk.Style()
+        style.theme_use('default')
+        style.configure('TCombobox', fieldbackground='white', background='white', foreground='black')
+        style.map('TCombobox', fieldbackground=[('readonly', 'white')], foreground=[('readonly', 'black')])
+        
+        self.selected_usb = tk.StringVar()
+        self.output_usb = tk.StringVar()
+        self.max_workers = tk.StringVar(value=str(DEFAULT_WORKERS))
+        self.differential = tk.BooleanVar(value=False)
+        self.engines = []
+        self.usb_volumes = []
+        self.disk_info = {}
+        self.discovery = VolumeDiscovery()
+        
+        self.notebook = ttk.Notebook(root)
+        self.notebook.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        self.tab1 = tk.Frame(self.notebook, bg='#E8E8E8')
+        self.notebook.add(self.tab1, text='1. USB Preparation')
+        
+        self.tab2 = tk.Frame(self.notebook, bg='#E8E8E8')
+        self.notebook.add(self.tab2, text='2. Trusted Terminal')
+        
+        self.tab3 = tk.Frame(self.notebook, bg='#E8E8E8')
+        self.notebook.add(self.tab3, text='3. Live Response')
+        
+        self.setup_preparation_tab()
+        self.setup_liveresponse_tab()
+        self.setup_live_response_tab()
+        
+        self.prep_sink = LogSink(root, self.prep_log)
+        self.live_sink = LogSink(root, self.live_log)
+        self.response_sink = LogSink(root, self.response_log)
+        
+    def setup_preparation_tab(self):
+        header_frame = tk.Frame(self.tab1, bg='#E8E8E8')
+        header_frame.pack(fill='x', pady=15)
+        
+        header = tk.Label(header_frame, text="USB Stick Preparation | Do that on your forensic Mac!", 
+                         font=('Helvetica', 18, 'bold'), bg='#E8E8E8', fg='#1a1a1a')
+        header.pack()
+        
+        info_frame = tk.LabelFrame(self.tab1, text=" Important Information ", 
+                                  font=('Helvetica', 11, 'bold'), 
+                                  bg='#FFE6B3', fg='#1a1a1a', padx=15, pady=15)
+        info_frame.pack(fill='x', padx=20, pady=10)
+        
+        info_text = ("⚠️  Please use an APFS formatted USB stick!\n\n"
+                    "Format your USB stick with Disk Utility before using this tool:\n"
+                    "• Open Disk Utility\n"
+                    "• Select your USB stick\n"
+                    "• Click 'Erase' and choose 'APFS' as format\n"
+                    "• Give it a name (e.g., 'forensic')")
+        tk.Label(info_frame, text=info_text, justify='left', bg='#FFE6B3', fg='#1a1a1a',
+                font=('Helvetica', 10)).pack(anchor='w', pady=5)
+        
+        usb_frame = tk.LabelFrame(self.tab1, text=" USB Stick Selection ", 
+                                 font=('Helvetica', 11, 'bold'), 
+                                 bg='#D3D3D3', fg='#1a1a1a', padx=15, pady=15)
+        usb_frame.pack(fill='x', padx=20, pady=10)
+        
+        btn_frame = tk.Frame(usb_frame, bg='#D3D3D3')
+        btn_frame.pack(fill='x', pady=5)
+        
+        tk.Button(btn_frame, text="🔍 Scan USB Sticks", 
+                 command=self.scan_usb_devices,
+                 bg='#505050', fg='black', font=('Helvetica', 10),
+                 padx=10, pady=5, relief=tk.RAISED, bd=2).pack(side='left', padx=5)
+        
+        self.usb_combo = ttk.Combobox(btn_frame, textvariable=self.selected_usb, 
+                                      state='readonly', width=50, font=('Helvetica', 10))
+        self.usb_combo.pack(side='left', padx=10, fill='x', expand=True)
+        
+        self.disk_info_label = tk.Label(usb_frame, text="", bg='#D3D3D3', 
+                                       fg='#505050', font=('Helvetica', 9, 'italic'))
+        self.disk_info_label.pack(pady=5)
+        
+        copy_frame = tk.LabelFrame(self.tab1, text=" Copy Trusted Binaries ", 
+                                  font=('Helvetica', 11, 'bold'),
+                                  bg='#D3D3D3', fg='#1a1a1a', padx=15, pady=15)
+        copy_frame.pack(fill='x', padx=20, pady=10)
+        
+        info_text = ("The following directories will be copied:\n"
+                    "• /usr/bin  • /bin  • /usr/sbin  • /sbin\n"
+                    "• /usr/X11/bin  • /usr/sbin/system_profiler")
+        tk.Label(copy_frame, text=info_text, justify='left', bg='#D3D3D3', fg='#1a1a1a',
+                font=('Helvetica', 9)).pack(anchor='w', pady=5)
+        
+        tk.Button(copy_frame, text="📦 Copy Binaries (requires sudo)", 
+                 command=self.copy_binaries,
+                 bg='#505050', fg='black', font=('Helvetica', 10, 'bold'),
+                 padx=15, pady=8, relief=tk.RAISED, bd=2).pack(pady=10)
+        
+        self.prep_progress_frame = tk.LabelFrame(self.tab1, text=" Status ", 
+                                                font=('Helvetica', 11, 'bold'),
+                                                bg='#D3D3D3', fg='#1a1a1a', 
+                                                padx=15, pady=10)
+        self.prep_progress_frame.pack(fill='both', expand=True, padx=20, pady=10)
+        
+        self.prep_log = scrolledtext.ScrolledText(self.prep_progress_frame, 
+                                                  height=10, 
+                                                  bg='#F5F5F5', 
+                                                  fg='#000000',
+                                                  font=('Courier', 9),
+                                                  relief=tk.SUNKEN, bd=2)
+        self.prep_log.pack(fill='both', expand=True)
+        
+    def setup_liveresponse_tab(self):
+        header_frame = tk.Frame(self.tab2, bg='#E8E8E8')
+        header_frame.pack(fill='x', pady=15)
+        
+        header = tk.Label(header_frame, text="Trusted Terminal Setup | Do that on the suspects Mac!", 
+                         font=('Helvetica', 18, 'bold'), bg='#E8E8E8', fg='#1a1a1a')
+        header.pack()
+        
+        usb_frame = tk.LabelFrame(self.tab2, text=" USB Stick Selection ", 
+                                 font=('Helvetica', 11, 'bold'),
+                                 bg='#D3D3D3', fg='#1a1a1a', padx=15, pady=15)
+        usb_frame.pack(fill='x', padx=20, pady=10)
+        
+        btn_frame = tk.Frame(usb_frame, bg='#D3D3D3')
+        btn_frame.pack(fill='x')
+        
+        tk.Button(btn_frame, text="🔍 Scan USB Sticks", 
+                 command=self.scan_usb_devices_live,
+                 bg='#505050', fg='black', font=('Helvetica', 10),
+                 padx=10, pady=5, relief=tk.RAISED, bd=2).pack(side='left', padx=5)
+        
+        self.usb_combo_live = ttk.Combobox(btn_frame, state='readonly', width=50,
+                                          font=('Helvetica', 10))
+        self.usb_combo_live.pack(side='left', padx=10, fill='x', expand=True)
+        
+        actions_frame = tk.LabelFrame(self.tab2, text=" Trusted Terminal Actions ", 
+                                     font=('Helvetica', 11, 'bold'),
+                                     bg='#D3D3D3', fg='#1a1a1a', padx=15, pady=15)
+        actions_frame.pack(fill='x', padx=20, pady=10)
+        
+        button_config = {
+            'font': ('Helvetica', 10),
+            'width': 45,
+            'pady': 8,
+            'relief': tk.RAISED,
+            'bd': 2
+        }
+        
+        tk.Button(actions_frame, text="1️⃣ Create Symbolic Link", 
+                 command=self.create_symlink, bg='#C0C0C0', fg='#1a1a1a',
+                 **button_config).pack(pady=3)
+        
+        tk.Button(actions_frame, text="2️⃣ Open Trusted Terminal", 
+                 command=self.open_trusted_terminal, bg='#C0C0C0', fg='#1a1a1a',
+                 **button_config).pack(pady=3)
+        
+        tk.Button(actions_frame, text="3️⃣ Adjust PATH Variable", 
+                 command=self.adjust_path, bg='#C0C0C0', fg='#1a1a1a',
+                 **button_config).pack(pady=3)
+        
+        tk.Button(actions_frame, text="4️⃣ Create Log File", 
+                 command=self.create_logfile, bg='#C0C0C0', fg='#1a1a1a',
+                 **button_config).pack(pady=3)
+        
+        ttk.Separator(actions_frame, orient='horizontal').pack(fill='x', pady=10)
+        
+        tk.Button(actions_frame, text="🚀 Execute All Steps Automatically", 
+                 command=self.run_all_steps, bg='#505050', fg='black',
+                 font=('Helvetica', 11, 'bold'), width=45, pady=10,
+                 relief=tk.RAISED, bd=3).pack(pady=5)
+        
+        info_frame = tk.LabelFrame(self.tab2, text=" Information ", 
+                                  font=('Helvetica', 11, 'bold'),
+                                  bg='#D3D3D3', fg='#1a1a1a', padx=15, pady=10)
+        info_frame.pack(fill='x', padx=20, pady=10)
+        
+        info_text = ("Steps for Live Response:\n"
+                    "1. Symbolic Link: /Volumes/[usb]/Terminal → bash\n"
+                    "2. Open Terminal from USB stick\n"
+                    "3. Set PATH to USB binaries\n"
+                    "4. Start logging with 'script'")
+        tk.Label(info_frame, text=info_text, justify='left', bg='#D3D3D3', fg='#1a1a1a',
+                font=('Helvetica', 9)).pack(anchor='w')
+        
+        self.live_log_frame = tk.LabelFrame(self.tab2, text=" Status ", 
+                                           font=('Helvetica', 11, 'bold'),
+                                           bg='#D3D3D3', fg='#1a1a1a',
+                                           padx=15, pady=10)
+        self.live_log_frame.pack(fill='both', expand=True, padx=20, pady=10)
+        
+        self.live_log = scrolledtext.ScrolledText(self.live_log_frame, 
+                                                  height=8, 
+                                                  bg='#F5F5F5', 
+                                                  fg='#000000',
+                                                  font=('Courier', 9),
+                                                  relief=tk.SUNKEN, bd=2)
+        self.live_log.pack(fill='both', expand=True)
+        
+    def discover_volumes(self, force=False):
+        volumes = self.discovery.scan(force=force)
+        self.disk_info = {volume.name: volume.physical_disk for volume in volumes}
+        self.usb_volumes = [volume.name for volume in volumes]
+        
+        for combo in (self.usb_combo, self.usb_combo_live, self.output_combo):
+            combo['values'] = self.usb_volumes
+            if combo.get() and combo.get() not in self.usb_volumes:
+                combo.set('')
+        return self.usb_volumes
+        
+    def scan_usb_devices(self):
+        self.log_prep("Scanning USB devices...")
+        try:
+            volumes = self.discover_volumes(force=True)
+            
+            if volumes:
+                self.usb_combo.current(0)
+                selected = volumes[0]
+                disk = self.disk_info.get(selected, 'unknown')
+                self.disk_info_label.config(text=f"Disk Identifier: {disk}")
+                self.log_prep(f"✓ {len(volumes)} Volume(s) found: {', '.join(volumes)}")
+                for vol in volumes:
+                    disk = self.disk_info.get(vol, 'unknown')
+                    self.log_prep(f"  • {vol} → {disk}")
+                
+                self.usb_combo_live.current(0)
+                self.output_combo.current(0)
+            else:
+                self.log_prep("⚠ No external volumes found")
+                self.disk_info_label.config(text="")
+                
+            def update_disk_label(event):
+                selected = self.selected_usb.get()
+                if selected:
+                    disk = self.disk_info.get(selected, 'unknown')
+                    self.disk_info_label.config(text=f"Disk Identifier: {disk}")
+                    
+                    self.usb_combo_live.set(selected)
+                    self.output_combo.set(selected)
+                    
+            self.usb_combo.bind('<<ComboboxSelected>>', update_disk_label)
+                
+        except Exception as e:
+            self.log_prep(f"✗ Scanning error: {str(e)}")
+            
+    def copy_binaries(self):
+        selected = self.selected_usb.get()
+        if not selected:
+            messagebox.showerror("Error", "Please select a USB stick first")
+            return
+            
+        volume_path = f"/Volumes/{selected}"
+        
+        if not os.path.exists(volume_path):
+            messagebox.showerror("Error", 
+                               f"Volume '{selected}' not found!\n"
+                               f"Please format the USB stick first.")
+            return
+            
+        response = messagebox.askyesno(
+            "Copy Binaries",
+            f"Trusted binaries will be copied to:\n{volume_path}\n\n"
+            f"This requires sudo rights. Binaries already on the stick are\n"
+            f"only copied again if they changed.\n\n"
+            f"Continue?"
+        )
+        
+        if not response:
+            return
+            
+        self.prep_sink.spill_to(os.path.join(volume_path, PREPARATION_LOG))
+        self.log_prep("Starting copy process (sudo required)...")
+        # a collection writing to the stick throttles and counts the copy as well
+        running = self.running_engine(volume_path)
+        governor = running.governor if running else Governor(DEFAULT_WORKERS)
+        
+        def copy_thread():
+            try:
+                if os.geteuid() == 0:
+                    set_io_policy(governor.io_policy, IOPOL_SCOPE_THREAD)
+                    stats = deploy(volume_path, log=self.log_prep, throttle=governor)
+                    for error in stats.errors:
+                        self.log_prep(f"⚠ {error}")
+                    self.log_prep(f"✓ {stats.summary()}")
+                    returncode = 1 if stats.errors else 0
+                else:
+                    limit = ['--limit', f"{governor.bucket.rate / MB:g}"] if governor.bucket.rate else []
+                    cmd = ['sudo', sys.executable, '-m', 'liveresponse.binaries'] + limit + [volume_path]
+                    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                            text=True, cwd=PROJECT_DIR)
+                    for line in proc.stdout:
+                        self.log_prep(line.rstrip('\n'))
+                    returncode = proc.wait()
+                
+                self.log_prep("\n" + "="*50)
+                if returncode == 0:
+                    self.log_prep("✓ Copy process completed!")
+                else:
+                    self.log_prep("⚠ Copy process completed with warnings")
+                self.log_prep(f"✓ USB stick '{selected}' is ready for Live Response.")
+                self.log_prep("="*50)
+                
+            except Exception as e:
+                self.log_prep(f"✗ Copy error: {str(e)}")
+                
+        threading.Thread(target=copy_thread, daemon=True).start()
+        
+    def scan_usb_devices_live(self):
+        self.log_live("Scanning USB devices...")
+        try:
+            volumes = self.discover_volumes()
+            
+            if volumes:
+                self.usb_combo_live.current(0)
+                self.log_live(f"✓ {len(volumes)} Volume(s) found: {', '.join(volumes)}")
+            else:
+                self.log_live("⚠ No external volumes found")
+                
+        except Exception as e:
+            self.log_live(f"✗ Error: {str(e)}")
+            
+    def get_selected_usb_live(self):
+        usb = self.usb_combo_live.get()
+        if not usb:
+            messagebox.showerror("Error", "Please select a USB stick first")
+            return None
+        self.live_sink.spill_to(os.path.join(f"/Volumes/{usb}", TRUSTED_TERMINAL_LOG))
+        return usb
+        
+    def create_symlink(self):
+        usb = self.get_selected_usb_live()
+        if not usb:
+            return
+            
+        volume_path = f"/Volumes/{usb}"
+        bash_path = f"{volume_path}/bin/bash"
+        terminal_link = f"{volume_path}/Terminal"
+        
+        if not os.path.exists(bash_path):
+            messagebox.showerror("Error", 
+                               f"bash not found in {bash_path}\n"
+                               f"Please copy binaries first!")
+            return
+            
+        try:
+            if os.path.exists(terminal_link):
+                os.remove(terminal_link)
+                
+            os.symlink(bash_path, terminal_link)
+            self.log_live(f"✓ Symbolic link created:")
+            self.log_live(f"  {terminal_link} → {bash_path}")
+            
+        except Exception as e:
+            self.log_live(f"✗ Link creation error: {str(e)}")
+            
+    def open_trusted_terminal(self):
+        usb = self.get_selected_usb_live()
+        if not usb:
+            return
+            
+        terminal_link = f"/Volumes/{usb}/Terminal"
+        
+        if not os.path.exists(terminal_link):
+            messagebox.showerror("Error", 
+                               "Symbolic link not found!\n"
+                               "Create the link first.")
+            return
+            
+        try:
+            subprocess.Popen(['open', '-a', 'Terminal', terminal_link])
+            self.log_live(f"✓ Trusted Terminal opened from:")
+            self.log_live(f"  {terminal_link}")
+            
+        except Exception as e:
+            self.log_live(f"✗ Terminal opening error: {str(e)}")
+            
+    def adjust_path(self):
+        usb = self.get_selected_usb_live()
+        if not usb:
+            return
+            
+        path_cmd = f"PATH=/Volumes/{usb}/usr/bin:/Volumes/{usb}/bin:/Volumes/{usb}/usr/sbin:/Volumes/{usb}/sbin:/Volumes/{usb}/usr/X11/bin"
+        
+        script_path = f"/Volumes/{usb}/set_path.sh"
+        
+        try:
+            with open(script_path, 'w') as f:
+                f.write("#!/bin/bash\n")
+                f.write(f"export {path_cmd}\n")
+                f.write('echo "✓ PATH set to trusted binaries"\n')
+                f.write('echo "PATH=$PATH"\n')
+                f.write('echo ""\n')
+                f.write('echo "Verification:"\n')
+                f.write('which bash\n')
+                f.write('which ls\n')
+                
+            os.chmod(script_path, 0o755)
+            
+            self.log_live(f"✓ PATH script created: {script_path}")
+            self.log_live("➜ Execute in Terminal:")
+            self.log_live(f"  source /Volumes/{usb}/set_path.sh")
+            
+        except Exception as e:
+            self.log_live(f"✗ Error: {str(e)}")
+            
+    def create_logfile(self):
+        usb = self.get_selected_usb_live()
+        if not usb:
+            return
+            
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        log_path = f"/Volumes/{usb}/liveresponse_{timestamp}.txt"
+        
+        helper_script = f"/Volumes/{usb}/start_logging.sh"
+        
+        try:
+            with open(helper_script, 'w') as f:
+                f.write("#!/bin/bash\n")
+                f.write(f"# Live Response Logging - {timestamp}\n")
+                f.write(f'echo "========================================"\n')
+                f.write(f'echo "Live Response Session Started"\n')
+                f.write(f'echo "Timestamp: {timestamp}"\n')
+                f.write(f'echo "Log File: {log_path}"\n')
+                f.write(f'echo "========================================"\n')
+                f.write(f'echo ""\n')
+                f.write(f"script {log_path}\n")
+                
+            os.chmod(helper_script, 0o755)
+            
+            self.log_live(f"✓ Logging script created: {helper_script}")
+            self.log_live(f"  Log file: {log_path}")
+            self.log_live("➜ Execute in Terminal:")
+            self.log_live(f"  source {helper_script}")
+            
+        except Exception as e:
+            self.log_live(f"✗ Error: {str(e)}")
+            
+    def run_all_steps(self):
+        usb = self.get_selected_usb_live()
+        if not usb:
+            return
+            
+        self.log_live("=" * 50)
+        self.log_live("Automatic execution of all steps")
+        self.log_live("=" * 50)
+        self.create_symlink()
+        self.log_live("")
+        self.adjust_path()
+        self.log_live("")
+        self.create_logfile()
+        self.log_live("")
+        self.log_live("=" * 50)
+        self.log_live("✓ All steps completed")
+        self.log_live("=" * 50)
+        self.log_live("Opening Terminal...")
+        self.open_trusted_terminal()
+        
+    def log_prep(self, message):
+        self.prep_sink.put(message)
+        
+    def log_live(self, message):
+        self.live_sink.put(message)
+        
+    def log_response(self, message):
+        self.response_sink.put(message)
+        
+    def setup_live_response_tab(self):
+        header_frame = tk.Frame(self.tab3, bg='#E8E8E8')
+        header_frame.pack(fill='x', pady=15)
+        
+        header = tk.Label(header_frame, text="Live Response Data Collection | Do that on the suspects Mac!", 
+                         font=('Helvetica', 18, 'bold'), bg='#E8E8E8', fg='#1a1a1a')
+        header.pack()
+        
+        usb_frame = tk.LabelFrame(self.tab3, text=" Output USB Stick ", 
+                                 font=('Helvetica', 11, 'bold'),
+                                 bg='#D3D3D3', fg='#1a1a1a', padx=15, pady=15)
+        usb_frame.pack(fill='x', padx=20, pady=10)
+        
+        btn_frame = tk.Frame(usb_frame, bg='#D3D3D3')
+        btn_frame.pack(fill='x')
+        
+        tk.Button(btn_frame, text="🔍 Scan USB Sticks", 
+                 command=self.scan_output_usb,
+                 bg='#505050', fg='black', font=('Helvetica', 10),
+                 padx=10, pady=5, relief=tk.RAISED, bd=2).pack(side='left', padx=5)
+        
+        self.output_combo = ttk.Combobox(btn_frame, textvariable=self.output_usb, 
+                                        state='readonly', width=50, font=('Helvetica', 10))
+        self.output_combo.pack(side='left', padx=10, fill='x', expand=True)
+        
+        tk.Label(btn_frame, text="Parallel jobs:", bg='#D3D3D3', fg='#1a1a1a',
+                font=('Helvetica', 10)).pack(side='left', padx=2)
+        tk.Spinbox(btn_frame, from_=1, to=16, width=3, textvariable=self.max_workers,
+                  font=('Helvetica', 10)).pack(side='left', padx=2)
+        tk.Checkbutton(btn_frame, text="Only changes since last run", variable=self.differential,
+                      bg='#D3D3D3', fg='#1a1a1a', font=('Helvetica', 10)).pack(side='left', padx=5)
+        
+        commands_frame = tk.LabelFrame(self.tab3, text=" Live Response Commands ", 
+                                      font=('Helvetica', 11, 'bold'),
+                                      bg='#D3D3D3', fg='#1a1a1a', padx=15, pady=15)
+        commands_frame.pack(fill='x', padx=20, pady=10)
+        
+        btn_config = {'font': ('Helvetica', 9), 'width': 35, 'pady': 5, 'relief': tk.RAISED, 'bd': 2}
+        
+        row1 = tk.Frame(commands_frame, bg='#D3D3D3')
+        row1.pack(fill='x', pady=2)
+        tk.Button(row1, text="System & Hardware", command=self.collect_system_info,
+                 bg='#A0A0A0', fg='#000000', **btn_config).pack(side='left', padx=2)
+        tk.Button(row1, text="FileVault Info", command=self.collect_filevault,
+                 bg='#A0A0A0', fg='#000000', **btn_config).pack(side='left', padx=2)
+        
+        row2 = tk.Frame(commands_frame, bg='#D3D3D3')
+        row2.pack(fill='x', pady=2)
+        tk.Button(row2, text="Processes & Services", command=self.collect_processes,
+                 bg='#A0A0A0', fg='#000000', **btn_config).pack(side='left', padx=2)
+        tk.Button(row2, text="Network Info", command=self.collect_network,
+                 bg='#A0A0A0', fg='#000000', **btn_config).pack(side='left', padx=2)
+        
+        row3 = tk.Frame(commands_frame, bg='#D3D3D3')
+        row3.pack(fill='x', pady=2)
+        tk.Button(row3, text="User Activities", command=self.collect_users,
+                 bg='#A0A0A0', fg='#000000', **btn_config).pack(side='left', padx=2)
+        tk.Button(row3, text="System Logs", command=self.collect_logs,
+                 bg='#A0A0A0', fg='#000000', **btn_config).pack(side='left', padx=2)
+        
+        row4 = tk.Frame(commands_frame, bg='#D3D3D3')
+        row4.pack(fill='x', pady=2)
+        tk.Button(row4, text="Logical Acquisition", command=self.collect_logical,
+                 bg='#A0A0A0', fg='#000000', **btn_config).pack(side='left', padx=2)
+        tk.Button(row4, text="Create Hashes", command=self.create_hashes,
+                 bg='#A0A0A0', fg='#000000', **btn_config).pack(side='left', padx=2)
+        tk.Button(row4, text="Quick Triage", command=self.collect_quick,
+                 bg='#A0A0A0', fg='#000000', **btn_config).pack(side='left', padx=2)
+        
+        ttk.Separator(commands_frame, orient='horizontal').pack(fill='x', pady=10)
+        
+        run_frame = tk.Frame(commands_frame, bg='#D3D3D3')
+        run_frame.pack(pady=5)
+        tk.Button(run_frame, text="🚀 Execute All Steps", 
+                 command=self.run_all_response,
+                 bg='#505050', fg='black', font=('Helvetica', 11, 'bold'),
+                 width=58, pady=10, relief=tk.RAISED, bd=3).pack(side='left', padx=2)
+        tk.Button(run_frame, text="⏹ Cancel", 
+                 command=self.cancel_collection,
+                 bg='#505050', fg='black', font=('Helvetica', 11, 'bold'),
+                 width=12, pady=10, relief=tk.RAISED, bd=3).pack(side='left', padx=2)
+        
+        log_frame = tk.LabelFrame(self.tab3, text=" Terminal Output ", 
+                                 font=('Helvetica', 11, 'bold'),
+                                 bg='#D3D3D3', fg='#1a1a1a', padx=15, pady=10)
+        log_frame.pack(fill='both', expand=True, padx=20, pady=10)
+        
+        self.response_log = scrolledtext.ScrolledText(log_frame, height=12, 
+                                                      bg='#F5F5F5', fg='#000000',
+                                                      font=('Courier', 9),
+                                                      relief=tk.SUNKEN, bd=2)
+        self.response_log.pack(fill='both', expand=True)
+        
+    def scan_output_usb(self):
+        self.log_response("Scanning USB devices...")
+        try:
+            volumes = self.discover_volumes()
+            
+            if volumes:
+                self.output_combo.current(0)
+                self.log_response(f"✓ {len(volumes)} Volume(s) found")
+            else:
+                self.log_response("⚠ No external volumes found")
+        except Exception as e:
+            self.log_response(f"✗ Error: {str(e)}")
+            
+    def get_output_path(self):
+        usb = self.output_usb.get()
+        if not usb:
+            messagebox.showerror("Error", "Please select an output USB medium first")
+            return None
+        return f"/Volumes/{usb}"
+        
+    def new_engine(self):
+        output_path = self.get_output_path()
+        if not output_path:
+            return None
+        try:
+            workers = int(self.max_workers.get())
+        except (tk.TclError, ValueError):
+            workers = DEFAULT_WORKERS
+        self.response_sink.spill_to(os.path.join(output_path, TERMINAL_OUTPUT_LOG))
+        options = {'baseline': self.differential.get(), 'chunk_size': DEFAULT_CHUNK_SIZE}
+        interrupted = interrupted_run(output_path)
+        if interrupted:
+            options['resume'] = messagebox.askyesno(
+                "Resume Collection",
+                f"An interrupted collection was found on this volume ({len(interrupted.done)} jobs finished).\n\n"
+                "Skip the finished jobs and continue partial acquisitions?")
+        # collections that overlap on one volume share its writes and the governor
+        running = self.running_engine(output_path)
+        shared = {'medium': running.medium, 'governor': running.governor} if running else {}
+        engine = CollectionEngine(output_path, max_workers=workers, log=self.log_response, options=options, **shared)
+        self.engines = [other for other in self.engines if other.report is None] + [engine]
+        return engine
+        
+    def running_engine(self, output_path):
+        # a collection started on this volume that has not finished yet
+        return next((engine for engine in self.engines
+                     if engine.report is None and engine.output_path == output_path), None)
+        
+    def cancel_collection(self):
+        running = [engine for engine in self.engines if engine.running]
+        if not running:
+            self.log_response("⚠ No collection running")
+            return
+        self.log_response(f"⏹ Cancelling {len(running)} collection(s)...")
+        for engine in running:
+            engine.cancel()
+        
+    def dispatch(self, *queue_funcs):
+        engine = self.new_engine()
+        if not engine:
+            return
+            
+        def run():
+            try:
+                for queue_func in queue_funcs:
+                    queue_func(engine)
+                engine.run_sync()
+            except Exception as e:
+                self.log_response(f"✗ Collection error: {str(e)}")
+                
+        threading.Thread(target=run, daemon=True).start()
+        
+    def collect_system_info(self):
+        self.dispatch(queue_system_info)
+        
+    def collect_filevault(self):
+        self.dispatch(queue_filevault)
+        
+    def collect_processes(self):
+        self.dispatch(queue_processes)
+        
+    def collect_network(self):
+        self.dispatch(queue_network)
+        
+    def collect_users(self):
+        self.dispatch(queue_users)
+        
+    def collect_logs(self):
+        self.dispatch(queue_logs)
+        
+    def collect_quick(self):
+        self.dispatch(lambda engine: queue_profile(engine, 'quick'))
+        
+    def collect_logical(self):
+        output_path = self.get_output_path()
+        if not output_path:
+            return
+            
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Logical Acquisition - Select Directory")
+        dialog.geometry("600x500")
+        dialog.configure(bg='#E8E8E8')
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        tk.Label(dialog, text="Select the directory to acquire:", 
+                font=('Helvetica', 12, 'bold'), bg='#E8E8E8', fg='#1a1a1a').pack(pady=10)
+        
+        frame = tk.Frame(dialog, bg='#D3D3D3', padx=15, pady=15)
+        frame.pack(fill='both', expand=True, padx=20, pady=10)
+        
+        listbox = tk.Listbox(frame, font=('Helvetica', 10), bg='white', fg='black',
+                            selectmode=tk.SINGLE, height=15)
+        listbox.pack(fill='both', expand=True)
+        
+        scrollbar = tk.Scrollbar(frame, orient="vertical", command=listbox.yview)
+        scrollbar.pack(side='right', fill='y')
+        listbox.config(yscrollcommand=scrollbar.set)
+        
+        directories = ACQUISITION_TARGETS
+        
+        for name in directories.keys():
+            listbox.insert(tk.END, name)
+        
+        listbox.selection_set(0)
+        
+        selected_dir = tk.StringVar()
+        
+        info_label = tk.Label(dialog, text="", font=('Helvetica', 9, 'italic'),
+                             bg='#E8E8E8', fg='#505050', wraplength=550)
+        info_label.pack(pady=5)
+        
+        def update_info(event=None):
+            selection = listbox.curselection()
+            if selection:
+                name = listbox.get(selection[0])
+                path = directories[name]
+                info_label.config(text=f"Path: {path}")
+        
+        listbox.bind('<<ListboxSelect>>', update_info)
+        update_info()
+        
+        options_frame = tk.Frame(dialog, bg='#E8E8E8')
+        options_frame.pack(pady=5)
+        
+        archive_format = tk.StringVar(value='gzip')
+        level = tk.StringVar(value=str(DEFAULT_LEVEL))
+        threads = tk.StringVar(value=str(DEFAULT_THREADS))
+        
+        tk.Label(options_frame, text="Format:", bg='#E8E8E8', fg='#1a1a1a',
+                font=('Helvetica', 10)).pack(side='left', padx=2)
+        ttk.Combobox(options_frame, textvariable=archive_format, values=ACQUISITION_FORMATS,
+                    state='readonly', width=6, font=('Helvetica', 10)).pack(side='left', padx=5)
+        tk.Label(options_frame, text="Level:", bg='#E8E8E8', fg='#1a1a1a',
+                font=('Helvetica', 10)).pack(side='left', padx=2)
+        tk.Spinbox(options_frame, from_=1, to=LEVELS['zstd'][1], width=3, textvariable=level,
+                  font=('Helvetica', 10)).pack(side='left', padx=5)
+        tk.Label(options_frame, text="Threads:", bg='#E8E8E8', fg='#1a1a1a',
+                font=('Helvetica', 10)).pack(side='left', padx=2)
+        tk.Spinbox(options_frame, from_=1, to=64, width=3, textvariable=threads,
+                  font=('Helvetica', 10)).pack(side='left', padx=5)
+        
+        filter_frame = tk.Frame(dialog, bg='#E8E8E8')
+        filter_frame.pack(pady=5)
+        
+        max_size = tk.StringVar()
+        days = tk.StringVar()
+        extensions = tk.StringVar()
+        skip_caches = tk.BooleanVar(value=False)
+        
+        tk.Label(filter_frame, text="Max MB:", bg='#E8E8E8', fg='#1a1a1a',
+                font=('Helvetica', 10)).pack(side='left', padx=2)
+        tk.Entry(filter_frame, textvariable=max_size, width=5,
+                font=('Helvetica', 10)).pack(side='left', padx=5)
+        tk.Label(filter_frame, text="Modified in last days:", bg='#E8E8E8', fg='#1a1a1a',
+                font=('Helvetica', 10)).pack(side='left', padx=2)
+        tk.Entry(filter_frame, textvariable=days, width=4,
+                font=('Helvetica', 10)).pack(side='left', padx=5)
+        tk.Label(filter_frame, text="Extensions:", bg='#E8E8E8', fg='#1a1a1a',
+                font=('Helvetica', 10)).pack(side='left', padx=2)
+        tk.Entry(filter_frame, textvariable=extensions, width=12,
+                font=('Helvetica', 10)).pack(side='left', padx=5)
+        tk.Checkbutton(filter_frame, text="Skip caches", variable=skip_caches,
+                      bg='#E8E8E8', fg='#1a1a1a', font=('Helvetica', 10)).pack(side='left', padx=5)
+        
+        button_frame = tk.Frame(dialog, bg='#E8E8E8')
+        button_frame.pack(pady=10)
+        
+        def on_ok():
+            selection = listbox.curselection()
+            if selection:
+                name = listbox.get(selection[0])
+                selected_dir.set(directories[name])
+                try:
+                    walk_filter = WalkFilter(
+                        max_size=round(float(max_size.get()) * MB) if max_size.get().strip() else None,
+                        newer=parse_time(days.get()) if days.get().strip() else None,
+                        extensions=extensions.get().replace(',', ' ').split(),
+                        skip_caches=skip_caches.get())
+                except ValueError:
+                    messagebox.showwarning("Invalid Filter", "Max MB and days must be numbers")
+                    return
+                try:
+                    level_value = clamp_level(archive_format.get(), int(level.get()))
+                    thread_count = max(1, int(threads.get()))
+                except ValueError:
+                    messagebox.showerror("Invalid Options", "Level and threads must be whole numbers")
+                    return
+                options = {
+                    'fmt': archive_format.get(),
+                    'level': level_value,
+                    'threads': thread_count,
+                    'walk_filter': walk_filter or None,
+                }
+                dialog.destroy()
+                start_acquisition(selected_dir.get(), name, options)
+            else:
+                messagebox.showwarning("Selection Required", "Please select a directory")
+        
+        def on_cancel():
+            dialog.destroy()
+        
+        tk.Button(button_frame, text="Start Acquisition", command=on_ok,
+                 bg='#505050', fg='black', font=('Helvetica', 10, 'bold'),
+                 padx=20, pady=8).pack(side='left', padx=5)
+        
+        tk.Button(button_frame, text="Cancel", command=on_cancel,
+                 bg='#808080', fg='black', font=('Helvetica', 10),
+                 padx=20, pady=8).pack(side='left', padx=5)
+        
+        def start_acquisition(path, name, options):
+            self.log_response(f"Starting logical acquisition: {name} "
+                              f"({options['fmt']}, level {options['level']}, {options['threads']} threads)...")
+            self.dispatch(lambda engine: queue_acquisition(engine, path, name, **options))
+        
+    def create_hashes(self):
+        output_path = self.get_output_path()
+        if not output_path:
+            return
+            
+        threading.Thread(target=self.hash_files, args=(output_path,), daemon=True).start()
+        
+    def hash_files(self, output_path):
+        self.log_response("Creating SHA-256 hashes...")
+        try:
+            manifest = Manifest(output_path, chunk_size=DEFAULT_CHUNK_SIZE)
+            hashed = manifest.hash_missing()
+            count = manifest.save()
+            
+            if count:
+                self.log_response(f"✓ {len(hashed)} unlisted file(s) hashed, {count} in manifest → checksums.txt")
+            else:
+                self.log_response("⚠ No files found to hash")
+                
+        except Exception as e:
+            self.log_response(f"✗ Error: {str(e)}")
+            
+    def run_all_response(self):
+        engine = self.new_engine()
+        if not engine:
+            return
+            
+        self.log_response("=" * 50)
+        self.log_response(f"Starting complete live response collection ({engine.max_workers} parallel jobs)")
+        self.log_response("=" * 50)
+        
+        queue_profile(engine, 'all')
+            
+        def run_all():
+            jobs, elapsed = engine.run_sync()
+            finished = [job for job in jobs if not job.error]
+            self.log_response(f"✓ {len(finished)}/{len(jobs)} jobs finished in {elapsed:.1f}s")
+            self.log_response(f"✓ Hashed on write → manifest.json, checksums.txt ({len(engine.manifest.entries)} artifacts)")
+            self.log_response(f"✓ Job timings → {RUN_REPORT}")
+            self.log_response("=" * 50)
+            self.log_response("⏹ Collection cancelled" if engine.cancelled.is_set() else "✓ Collection completed")
+            self.log_response("=" * 50)
+            
+        threading.Thread(target=run_all, daemon=True).start()
@@ -0,0 +1,97 @@
+import contextvars
+import glob
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from liveresponse.output import copy_stream
+
+
+USERS_DIR = '/Users'
+EXTRA_HOMES = {'root': '/private/var/root'}
+HISTORY_PATTERNS = [
+    '.zsh_history',
+    '.bash_history',
+    '.sh_history',
+    '.python_history',
+    '.local/share/fish/fish_history',
+    '.config/fish/fish_history',
+    # per-window histories kept by Terminal.app
+    '.zsh_sessions/*',
+    '.bash_sessions/*',
+]
+
+
+def user_homes(users_dir=USERS_DIR, extra_homes=EXTRA_HOMES):
+    homes = {}
+    try:
+        for entry in sorted(os.scandir(users_dir), key=lambda e: e.name):
+            if entry.is_dir(follow_symlinks=False) and not entry.name.startswith('.'):
+                homes[entry.name] = entry.path
+    except OSError:
+        pass
+    for user, home in extra_homes.items():
+        if user not in homes and os.path.isdir(home):
+            homes[user] = home
+    return homes
+
+
+def find_histories(home, patterns=HISTORY_PATTERNS):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(os.path.join(home, pattern))) if glob.has_magic(pattern) \
+            else [os.path.join(home, pattern)]
+        paths.extend(path for path in matches if os.path.isfile(path) and not os.path.islink(path))
+    return paths
+
+
+def collect_user(engine, user, home, output_file):
+    records = []
+    paths = find_histories(home)
+    if not paths:
+        return records
+
+    with engine.open_artifact(output_file) as writer:
+        for path in paths:
+            rel = os.path.relpath(path, home)
+            record = {'user': user, 'path': path, 'artifact': output_file,
+                      'size': None, 'mtime': None, 'copied': 0, 'error': None}
+            try:
+                st = os.stat(path)
+                record['size'] = st.st_size
+                record['mtime'] = datetime.fromtimestamp(st.st_mtime).isoformat(timespec='seconds')
+                with open(path, 'rb') as src:
+                    writer.write(f"=== {user} {rel} ===\n".encode())
+                    start = writer.bytes_written
+                    copy_stream(src, writer)
+                    record['copied'] = writer.bytes_written - start
+                    writer.write(b"\n\n")
+            except OSError as e:
+                record['error'] = e.strerror or str(e)
+                writer.write(f"=== {user} {rel} === ERROR: {record['error']}\n\n".encode())
+            records.append(record)
+    return records
+
+
+def collect_histories(engine, timestamp, homes=None):
+    homes = user_homes() if homes is None else homes
+
+    def collect(item):
+        user, home = item
+        output_file = f"{timestamp}_shell_history_{user}.txt"
+        try:
+            return collect_user(engine, user, home, output_file)
+        except OSError as e:
+            return [{'user': user, 'path': home, 'artifact': output_file,
+                     'size': None, 'mtime': None, 'copied': 0, 'error': e.strerror or str(e)}]
+
+    with ThreadPoolExecutor(max_workers=engine.max_workers) as pool:
+        # each copy runs in the caller's context so its artifacts are credited to the job
+        futures = [pool.submit(contextvars.copy_context().run, collect, item) for item in homes.items()]
+        records = [record for future in futures for record in future.result()]
+
+    index_file = f"{timestamp}_shell_history.json"
+    with engine.open_artifact(index_file) as writer:
+        writer.write(json.dumps({'histories': records}, indent=2).encode())
+    return index_file, records
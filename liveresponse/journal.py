@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+from liveresponse.manifest import JOURNAL
+
+
+# Append-only record of what a run has finished, one JSON object per line.
+# Every line is fsynced before the call returns, so after a crash or an
+# unplugged stick the journal ends at the last completed job or checkpoint
+# (plus at most one torn line, which is ignored when reading).
+#
+#   {"event": "run", "run": ...}                       run started or resumed
+#   {"event": "start", "run", "job", "artifact"}       job started
+#   {"event": "checkpoint", "run", "job", ...}         partial progress of a job
+#   {"event": "done", "run", "job", "artifacts": [...]} job finished, manifest entries
+#   {"event": "end", "run": ...}                       all jobs finished
+
+
+class Journal:
+    def __init__(self, output_path):
+        self.path = os.path.join(output_path, JOURNAL)
+        self._file = open(self.path, 'a')
+        self._lock = threading.Lock()
+
+    def append(self, event, **fields):
+        line = json.dumps(dict(event=event, time=datetime.now().isoformat(timespec='seconds'), **fields))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class RunState:
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.done = {}
+        self.started = {}
+        self.checkpoints = {}
+        self.complete = False
+
+
+def load_journal(output_path):
+    records = []
+    try:
+        with open(os.path.join(output_path, JOURNAL)) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return records
+
+
+def interrupted_run(output_path):
+    # state of the last run if it never reached its end record
+    runs = {}
+    for record in load_journal(output_path):
+        run_id = record.get('run')
+        if run_id is None:
+            continue
+        state = runs.setdefault(run_id, RunState(run_id))
+        event, job = record.get('event'), record.get('job')
+        if event == 'start':
+            state.started[job] = record.get('artifact')
+        elif event == 'checkpoint':
+            state.checkpoints[job] = record
+        elif event == 'done':
+            state.done[job] = record.get('artifacts', [])
+        elif event == 'end':
+            state.complete = True
+        elif event == 'run':
+            state.complete = False
+        # the run that wrote last is the one to resume
+        runs[run_id] = runs.pop(run_id)
+    if not runs:
+        return None
+    state = list(runs.values())[-1]
+    return None if state.complete else state
+
+
+def new_run_id():
+    return datetime.now().strftime("%Y%m%d_%H%M%S_%f")
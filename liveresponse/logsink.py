@@ -0,0 +1,92 @@
+import collections
+import queue
+from datetime import datetime
+
+
+DEFAULT_MAX_LINES = 2000
+DEFAULT_INTERVAL_MS = 100
+DEFAULT_BATCH = 1000
+
+
+class LogSink:
+    # worker threads only ever touch the queue; the Tk main loop drains it
+    # in batches, keeps the widget bounded and spills full history to a file
+    def __init__(self, root, widget, max_lines=DEFAULT_MAX_LINES,
+                 interval_ms=DEFAULT_INTERVAL_MS, batch=DEFAULT_BATCH):
+        self.root = root
+        self.widget = widget
+        self.max_lines = max_lines
+        self.interval_ms = interval_ms
+        self.batch = batch
+        self.queue = queue.SimpleQueue()
+        self.recent = collections.deque(maxlen=max_lines)
+        self.spill_path = None
+        self._spill_file = None
+        self.root.after(self.interval_ms, self._drain)
+
+    def put(self, message):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self.queue.put(f"[{timestamp}] {message}\n")
+
+    def spill_to(self, path):
+        self.spill_path = path
+
+    def _open_spill(self):
+        if self._spill_file and self._spill_file.name == self.spill_path:
+            return
+        if self._spill_file:
+            self._spill_file.close()
+        try:
+            self._spill_file = open(self.spill_path, 'a')
+            # lines logged before the volume was known
+            self._spill_file.writelines(self.recent)
+        except OSError:
+            self._spill_file = None
+            self.spill_path = None
+
+    def _drain(self):
+        lines = []
+        try:
+            while len(lines) < self.batch:
+                lines.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        try:
+            if lines:
+                text = ''.join(lines)
+                self.widget.insert('end', text)
+                excess = int(self.widget.index('end-1c').split('.')[0]) - 1 - self.max_lines
+                if excess > 0:
+                    self.widget.delete('1.0', f'{excess + 1}.0')
+                self.widget.see('end')
+
+                if self.spill_path:
+                    self._open_spill()
+                if self._spill_file:
+                    self._write_spill(text)
+                if not self._spill_file:
+                    self.recent.extend(lines)
+        finally:
+            # drain again immediately while a burst is still queued
+            self.root.after(1 if len(lines) == self.batch else self.interval_ms, self._drain)
+
+    def _write_spill(self, text):
+        # a full or unplugged volume stops the spill, not the log pane
+        try:
+            self._spill_file.write(text)
+            self._spill_file.flush()
+        except OSError as e:
+            path = self.spill_path
+            try:
+                self._spill_file.close()
+            except OSError:
+                pass
+            self._spill_file = None
+            self.spill_path = None
+            self.put(f"⚠ Log file {path} could not be written, logging to the window only: {e}")
+
+    def close(self):
+        if self._spill_file:
+            self._spill_file.close()
+            self._spill_file = None
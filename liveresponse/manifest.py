@@ -0,0 +1,179 @@
+import csv
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from liveresponse.merkle import PARALLEL_CHUNKS, ChunkTree, chunk_count, new_pool, submit_chunks, tree_entry
+
+
+MANIFEST_JSON = "manifest.json"
+MANIFEST_CSV = "manifest.csv"
+CHECKSUMS_TXT = "checksums.txt"
+RUN_REPORT = "run_report.json"
+JOURNAL = "journal.ndjson"
+# GUI logs keep growing while the tool runs and are never hashed
+PREPARATION_LOG = "usb_preparation.log"
+TRUSTED_TERMINAL_LOG = "trusted_terminal.log"
+TERMINAL_OUTPUT_LOG = "terminal_output.log"
+DEFAULT_DIGESTS = ('sha256',)
+ARTIFACT_PATTERNS = ('*.txt', '*.log', '*.gz', '*.zst', '*.json', '*.ndjson', '*.plist', '*.db')
+
+_save_lock = threading.Lock()
+
+
+class MultiHasher:
+    def __init__(self, algorithms=DEFAULT_DIGESTS, chunk_size=None):
+        self.hashers = {name: hashlib.new(name) for name in algorithms}
+        self.tree = ChunkTree(chunk_size) if chunk_size else None
+
+    def update(self, data):
+        for hasher in self.hashers.values():
+            hasher.update(data)
+        if self.tree:
+            self.tree.update(data)
+
+    def hexdigests(self):
+        return {name: hasher.hexdigest() for name, hasher in self.hashers.items()}
+
+    def chunk_tree(self):
+        return self.tree.entry() if self.tree else None
+
+
+class Manifest:
+    # chunk_size: also record a chunked hash tree of every artifact, see merkle.py
+    def __init__(self, output_path, algorithms=DEFAULT_DIGESTS, chunk_size=None):
+        for name in algorithms:
+            hashlib.new(name)
+        if 'sha256' not in algorithms:
+            algorithms = ('sha256',) + tuple(algorithms)
+        self.output_path = output_path
+        self.algorithms = tuple(algorithms)
+        self.chunk_size = chunk_size
+        self.entries = {}
+        self.first_recorded = None
+        self._lock = threading.Lock()
+
+    def hasher(self):
+        return MultiHasher(self.algorithms, self.chunk_size)
+
+    def record(self, path, size, digests, tree=None, content=None):
+        # content: size and digests of what a compressed artifact expands to
+        name = os.path.relpath(path, self.output_path)
+        with self._lock:
+            if self.first_recorded is None:
+                self.first_recorded = time.monotonic()
+            self.entries[name] = {
+                'name': name,
+                'size': size,
+                'completed': datetime.now().isoformat(timespec='seconds'),
+                'digests': digests,
+            }
+            if tree:
+                self.entries[name]['chunks'] = tree
+            if content:
+                self.entries[name]['content'] = content
+
+    def discard(self, path):
+        # output of a failed job is left on the volume but not vouched for
+        with self._lock:
+            self.entries.pop(os.path.relpath(path, self.output_path), None)
+
+    def hash_file(self, path, chunk_size=1024 * 1024):
+        # the chunks of a large file are hashed on the other cores while this
+        # thread computes the plain digests
+        total = os.path.getsize(path)
+        parallel = self.chunk_size and chunk_count(total, self.chunk_size) >= PARALLEL_CHUNKS
+        hasher = MultiHasher(self.algorithms, None if parallel else self.chunk_size)
+        pool = new_pool() if parallel else None
+        try:
+            futures = submit_chunks(pool, path, total, self.chunk_size) if parallel else []
+            size = 0
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    size += len(chunk)
+            tree = hasher.chunk_tree()
+            if parallel:
+                tree = tree_entry(self.chunk_size, [leaf for future in futures for leaf in future.result()])
+        finally:
+            if pool:
+                pool.shutdown()
+        self.record(path, size, hasher.hexdigests(), tree)
+
+    def hash_missing(self, patterns=ARTIFACT_PATTERNS):
+        # hashes artifacts on the volume that were not written through the engine
+        known = set(load_entries(self.output_path)) | set(self.entries)
+        hashed = []
+        for name in artifact_names(self.output_path, patterns):
+            if name not in known:
+                self.hash_file(os.path.join(self.output_path, name))
+                hashed.append(name)
+        return hashed
+
+    def save(self):
+        with _save_lock:
+            entries = load_entries(self.output_path)
+            with self._lock:
+                entries.update(self.entries)
+            ordered = [entries[name] for name in sorted(entries)]
+            algorithms = sorted({alg for entry in ordered for alg in entry['digests']})
+
+            write_atomic(os.path.join(self.output_path, MANIFEST_JSON),
+                         lambda f: json.dump({'artifacts': ordered}, f, indent=2))
+
+            def write_csv(f):
+                writer = csv.writer(f)
+                writer.writerow(['name', 'size', 'completed'] + algorithms +
+                                ['chunk_size', 'chunk_root', 'content_size', 'content_sha256'])
+                for entry in ordered:
+                    tree = entry.get('chunks', {})
+                    content = entry.get('content', {})
+                    writer.writerow([entry['name'], entry['size'], entry['completed']] +
+                                    [entry['digests'].get(alg, '') for alg in algorithms] +
+                                    [tree.get('chunk_size', ''), tree.get('root', ''),
+                                     content.get('size', ''), content.get('digests', {}).get('sha256', '')])
+
+            write_atomic(os.path.join(self.output_path, MANIFEST_CSV), write_csv)
+
+            # shasum -a 256 -c compatible
+            write_atomic(os.path.join(self.output_path, CHECKSUMS_TXT),
+                         lambda f: f.writelines(f"{entry['digests']['sha256']}  {entry['name']}\n"
+                                                for entry in ordered if 'sha256' in entry['digests']))
+            return len(ordered)
+
+
+def artifact_names(output_path, patterns=ARTIFACT_PATTERNS):
+    # files on the volume that belong in the manifest
+    skip = {MANIFEST_JSON, MANIFEST_CSV, CHECKSUMS_TXT, RUN_REPORT, JOURNAL,
+            PREPARATION_LOG, TRUSTED_TERMINAL_LOG, TERMINAL_OUTPUT_LOG}
+    names = []
+    for name in sorted(os.listdir(output_path)):
+        if name in skip or name.startswith('.'):
+            continue
+        if any(fnmatch.fnmatch(name, pattern) for pattern in patterns) and \
+                os.path.isfile(os.path.join(output_path, name)):
+            names.append(name)
+    return names
+
+
+def load_entries(output_path):
+    path = os.path.join(output_path, MANIFEST_JSON)
+    try:
+        with open(path) as f:
+            return {entry['name']: entry for entry in json.load(f)['artifacts']}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def write_atomic(path, write):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', newline='') as f:
+        write(f)
+    os.replace(tmp_path, path)
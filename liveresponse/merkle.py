@@ -0,0 +1,100 @@
+import hashlib
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Chunked hash tree of an artifact: SHA-256 of every fixed-size chunk (the
+# leaves) and a Merkle root over them. Unlike the plain SHA-256 the chunks
+# can be hashed and verified on all cores, and a mismatch points at the
+# damaged chunk. Leaves and nodes are domain separated as in RFC 6962:
+#   leaf = sha256(0x00 || chunk), node = sha256(0x01 || left || right)
+# an odd node at the end of a level is carried up unchanged, an empty file
+# has a single empty chunk.
+
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+# below this many chunks starting worker processes costs more than it saves
+PARALLEL_CHUNKS = 4
+DEFAULT_PROCESSES = os.cpu_count() or 1
+
+
+def merkle_root(leaves):
+    level = [bytes.fromhex(leaf) for leaf in leaves]
+    while len(level) > 1:
+        level = [hashlib.sha256(b'\x01' + level[i] + level[i + 1]).digest() if i + 1 < len(level) else level[i]
+                 for i in range(0, len(level), 2)]
+    return level[0].hex()
+
+
+def tree_entry(chunk_size, leaves):
+    return {'chunk_size': chunk_size, 'root': merkle_root(leaves), 'leaves': leaves}
+
+
+class ChunkTree:
+    # builds the leaves from a stream, e.g. while an artifact is written
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.leaves = []
+        self._hasher = hashlib.sha256(b'\x00')
+        self._filled = 0
+
+    def update(self, data):
+        view = memoryview(data)
+        while view:
+            take = min(len(view), self.chunk_size - self._filled)
+            self._hasher.update(view[:take])
+            self._filled += take
+            view = view[take:]
+            if self._filled == self.chunk_size:
+                self.leaves.append(self._hasher.hexdigest())
+                self._hasher = hashlib.sha256(b'\x00')
+                self._filled = 0
+
+    def entry(self):
+        leaves = list(self.leaves)
+        if self._filled or not leaves:
+            leaves.append(self._hasher.hexdigest())
+        return tree_entry(self.chunk_size, leaves)
+
+
+def _hash_chunks(path, first, count, chunk_size):
+    # runs in a worker process; chunk_size is a multiple of the mmap granularity
+    leaves = []
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        for index in range(first, first + count):
+            offset = index * chunk_size
+            length = min(chunk_size, size - offset)
+            hasher = hashlib.sha256(b'\x00')
+            if length > 0:
+                with mmap.mmap(f.fileno(), length, offset=offset, access=mmap.ACCESS_READ) as view:
+                    hasher.update(view)
+            leaves.append(hasher.hexdigest())
+    return leaves
+
+
+def chunk_count(size, chunk_size):
+    return max(1, -(-size // chunk_size))
+
+
+def submit_chunks(pool, path, size, chunk_size, processes=DEFAULT_PROCESSES):
+    # futures that return consecutive runs of leaves, a few per process
+    count = chunk_count(size, chunk_size)
+    batch = max(1, count // (processes * 4))
+    return [pool.submit(_hash_chunks, path, first, min(batch, count - first), chunk_size)
+            for first in range(0, count, batch)]
+
+
+def new_pool(processes=DEFAULT_PROCESSES):
+    return ProcessPoolExecutor(max_workers=max(1, processes))
+
+
+def mismatched_chunks(actual, expected):
+    bad = [index for index, (a, b) in enumerate(zip(actual, expected)) if a != b]
+    return bad + list(range(min(len(actual), len(expected)), max(len(actual), len(expected))))
+
+
+def check_tree(leaves, tree):
+    # (indexes of the chunks that differ from the recorded tree, whether the
+    # root of the hashed leaves is the recorded root)
+    return mismatched_chunks(leaves, tree['leaves']), merkle_root(leaves) == tree['root']
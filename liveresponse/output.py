@@ -0,0 +1,371 @@
+import fcntl
+import gzip
+import io
+import os
+import threading
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# the MB of sizes and rates given on the command line and in the GUI
+MB = 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+# text artifacts compressed while they are written
+COMPRESSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+COMPRESSION_LEVELS = {'gzip': 6, 'zstd': 3}
+# writes to the output volume are whole multiples of this, see OutputMedium
+WRITE_BUFFER = 4 * 1024 * 1024
+FSYNC_POLICIES = ('artifact', 'batch', 'end')
+DEFAULT_FSYNC = 'batch'
+BATCH_BYTES = 64 * 1024 * 1024
+BATCH_FILES = 32
+
+
+class Cancelled(Exception):
+    pass
+
+
+class OutputMedium:
+    # Write side of the output volume, shared by every artifact of a run.
+    # USB sticks cope with a few large sequential writes far better than with
+    # many small interleaved ones, so artifact writers hand over whole buffers
+    # (multiples of buffer_size at aligned offsets) and one write runs at a
+    # time; an artifact that never fills its buffer is staged in memory and
+    # written in one go when it closes. fsync policy:
+    #   artifact  every artifact before it is closed
+    #   batch     closed artifacts together once BATCH_BYTES or BATCH_FILES are pending
+    #   end       a single sync of the volume when the run finishes
+    def __init__(self, fsync=DEFAULT_FSYNC, buffer_size=WRITE_BUFFER):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"unknown fsync policy '{fsync}'")
+        self.fsync = fsync
+        self.buffer_size = buffer_size
+        self.bytes_written = 0
+        self.writes = 0
+        self.write_seconds = 0.0
+        self.syncs = 0
+        self.sync_seconds = 0.0
+        self.spooled = 0
+        # duplicated descriptors of closed artifacts that still need an fsync
+        self._pending = []
+        self._pending_bytes = 0
+        self._lock = threading.Lock()
+
+    def write(self, fd, data):
+        with self._lock:
+            started = time.monotonic()
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            self.write_seconds += time.monotonic() - started
+            self.bytes_written += len(data)
+            self.writes += 1
+
+    def staged(self):
+        with self._lock:
+            self.spooled += 1
+
+    def closing(self, fd, size):
+        # called with the descriptor of an artifact that is about to be closed
+        if self.fsync == 'artifact':
+            self._sync([fd])
+        elif self.fsync == 'batch':
+            with self._lock:
+                self._pending.append(os.dup(fd))
+                self._pending_bytes += size
+                full = self._pending_bytes >= BATCH_BYTES or len(self._pending) >= BATCH_FILES
+            if full:
+                self.flush_pending()
+
+    def flush_pending(self):
+        with self._lock:
+            pending, self._pending, self._pending_bytes = self._pending, [], 0
+        try:
+            if pending:
+                self._sync(pending)
+        finally:
+            for fd in pending:
+                os.close(fd)
+
+    def finish(self):
+        self.flush_pending()
+        if self.fsync == 'end':
+            started = time.monotonic()
+            with self._lock:
+                os.sync()
+                self.syncs += 1
+                self.sync_seconds += time.monotonic() - started
+
+    def _sync(self, fds):
+        with self._lock:
+            started = time.monotonic()
+            # the drive cache is flushed once, after every file of the batch reached the drive
+            for fd in fds[:-1]:
+                os.fsync(fd)
+            full_fsync(fds[-1])
+            self.syncs += 1
+            self.sync_seconds += time.monotonic() - started
+
+    def summary(self, since=None):
+        m = self.metrics(since)
+        return (f"{m['bytes_written'] / MB:.1f} MB in {m['writes']} writes, {m['staged_artifacts']} artifacts "
+                f"staged in memory, {m['syncs']} syncs ({self.fsync}), {m['bytes_per_s'] / MB:.1f} MB/s "
+                f"to the volume")
+
+    def metrics(self, since=None):
+        # since: earlier metrics of a medium several runs share, the result
+        # then only covers what was written after them
+        counters = {'bytes_written': self.bytes_written, 'writes': self.writes, 'write_s': self.write_seconds,
+                    'syncs': self.syncs, 'sync_s': self.sync_seconds, 'staged_artifacts': self.spooled}
+        if since:
+            counters = {key: value - since[key] for key, value in counters.items()}
+        # what the volume achieved while it was being written to
+        busy = counters['write_s'] + counters['sync_s']
+        return {
+            'fsync': self.fsync,
+            'buffer_bytes': self.buffer_size,
+            'bytes_written': counters['bytes_written'],
+            'writes': counters['writes'],
+            'write_s': round(counters['write_s'], 3),
+            'syncs': counters['syncs'],
+            'sync_s': round(counters['sync_s'], 3),
+            'staged_artifacts': counters['staged_artifacts'],
+            'bytes_per_s': round(counters['bytes_written'] / busy) if busy > 0 else 0,
+        }
+
+
+def full_fsync(fd):
+    # fsync() on macOS leaves the data in the drive's cache, F_FULLFSYNC flushes it
+    if hasattr(fcntl, 'F_FULLFSYNC'):
+        try:
+            fcntl.fcntl(fd, fcntl.F_FULLFSYNC)
+            return
+        except OSError:
+            pass
+    os.fsync(fd)
+
+
+class ArtifactWriter:
+    def __init__(self, path, manifest=None, lazy=False, throttle=None, resume_at=None, cancel=None, medium=None):
+        self.path = path
+        self.manifest = manifest
+        self.throttle = throttle
+        # threading.Event set when the collection is cancelled; the next write
+        # raises, which also stops jobs running in worker threads
+        self.cancel = cancel
+        # OutputMedium the writes go through; without one the file is written
+        # directly with default buffering
+        self.medium = medium
+        self.lazy = lazy
+        self.hasher = manifest.hasher() if manifest else None
+        self.bytes_written = 0
+        # size and digests of the uncompressed content, set by CompressingWriter
+        self.content = None
+        self._file = None
+        self._buffer = bytearray()
+        # file offset the buffer starts at
+        self._position = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        if resume_at is not None:
+            self._resume(resume_at)
+        elif not lazy:
+            # created up front so a checkpoint can refer to it, even while its content is still staged
+            self._open()
+
+    def _open(self):
+        self._file = open(self.path, 'wb', buffering=0 if self.medium else -1)
+
+    def _resume(self, offset):
+        # continues a partial artifact after its last checkpoint; the kept
+        # prefix is read back so the digest still covers the whole file
+        self._file = open(self.path, 'r+b', buffering=0 if self.medium else -1)
+        if os.fstat(self._file.fileno()).st_size < offset:
+            self._file.close()
+            raise OSError(f"{self.path} is shorter than its last checkpoint ({offset} bytes)")
+        self._file.truncate(offset)
+        while True:
+            chunk = self._file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            if self.hasher:
+                self.hasher.update(chunk)
+            self.bytes_written += len(chunk)
+        self._position = offset
+
+    def write(self, data):
+        if self.cancel is not None and self.cancel.is_set():
+            raise Cancelled(f"cancelled while writing {os.path.basename(self.path)}")
+        if self.throttle:
+            self.throttle.consume(len(data))
+        with self._lock:
+            if self.medium:
+                self._buffer += data
+                self._flush_full()
+            else:
+                if self._file is None:
+                    self._open()
+                self._file.write(data)
+            if self.hasher:
+                self.hasher.update(data)
+            self.bytes_written += len(data)
+
+    def _flush_full(self):
+        # writes whole buffers only, the first one up to the next aligned offset
+        size = self.medium.buffer_size
+        while len(self._buffer) >= size - self._position % size:
+            count = size - self._position % size
+            self._flush(count)
+
+    def _flush(self, count):
+        if self._file is None:
+            self._open()
+        if not count:
+            return
+        with memoryview(self._buffer) as view, view[:count] as chunk:
+            self.medium.write(self._file.fileno(), chunk)
+        del self._buffer[:count]
+        self._position += count
+
+    def sync(self):
+        with self._lock:
+            if self.medium and (self._buffer or self._file is None):
+                self._flush(len(self._buffer))
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._closed:
+            return
+        if self.medium:
+            if self._file is None and not self._buffer:
+                return
+            if self._position == 0 and self._buffer:
+                self.medium.staged()
+            self._flush(len(self._buffer))
+            self.medium.closing(self._file.fileno(), self._position)
+        elif self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self._closed = True
+        if self.manifest:
+            self.manifest.record(self.path, self.bytes_written, self.hasher.hexdigests(), self.hasher.chunk_tree(),
+                                 self.content)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CompressingWriter:
+    # Compresses an artifact while it is streamed to the volume. The artifact
+    # writer hashes the stored bytes as usual; the original bytes are hashed
+    # here and recorded next to them in the manifest.
+    def __init__(self, writer, compression, hasher, level=None):
+        level = COMPRESSION_LEVELS[compression] if level is None else level
+        if compression == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("zstd compression requires the 'zstandard' module")
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            # wbits 31: gzip container, mtime 0 so equal output compresses to equal bytes
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        self.writer = writer
+        self.hasher = hasher
+        self.bytes_written = 0
+
+    @property
+    def path(self):
+        return self.writer.path
+
+    def write(self, data):
+        self.hasher.update(data)
+        self.bytes_written += len(data)
+        compressed = self._compressor.compress(data)
+        if compressed:
+            self.writer.write(compressed)
+
+    def close(self):
+        if self._compressor is None:
+            return
+        compressor, self._compressor = self._compressor, None
+        try:
+            # the trailer write fails when the collection is cancelled, the file is closed all the same
+            self.writer.write(compressor.flush())
+        finally:
+            self.writer.content = {'size': self.bytes_written, 'digests': self.hasher.hexdigests()}
+            self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def compressed_name(name, compression):
+    return name + COMPRESSIONS[compression] if compression else name
+
+
+def compression_of(name):
+    return next((compression for compression, extension in COMPRESSIONS.items() if name.endswith(extension)), None)
+
+
+def strip_compression(name):
+    compression = compression_of(name)
+    return name[:-len(COMPRESSIONS[compression])] if compression else name
+
+
+def open_stored(path):
+    # binary reader of an artifact's original content, decompressed if needed
+    compression = compression_of(path)
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError(f"reading {os.path.basename(path)} requires the 'zstandard' module")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True))
+    return open(path, 'rb')
+
+
+class Tee:
+    # hands every chunk written to the artifact on to an observer, e.g. a parser
+    def __init__(self, writer, observer):
+        self.writer = writer
+        self.observer = observer
+
+    @property
+    def bytes_written(self):
+        return self.writer.bytes_written
+
+    def write(self, data):
+        self.writer.write(data)
+        self.observer.write(data)
+
+
+def sibling_path(path, suffix):
+    # x.txt, x.txt.gz and x.tar.zst all share x.<suffix>.txt
+    base = os.path.splitext(strip_compression(path))[0]
+    if base.endswith('.tar'):
+        base = base[:-len('.tar')]
+    return f"{base}.{suffix}.txt"
+
+
+def copy_stream(src, writer, chunk_size=CHUNK_SIZE):
+    # read1() hands over whatever a pipe has buffered instead of waiting for a full chunk
+    read = getattr(src, 'read1', src.read)
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        writer.write(chunk)
+    return writer.bytes_written
@@ -0,0 +1,106 @@
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+from liveresponse.manifest import RUN_REPORT, write_atomic
+from liveresponse.output import MB
+
+_save_lock = threading.Lock()
+
+
+def rss_bytes(maxrss):
+    # ru_maxrss is in bytes on macOS and in KiB on Linux
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def iso(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat(timespec='milliseconds') if timestamp else None
+
+
+def job_metrics(job):
+    duration = job.finished_at - job.started_at if job.started_at and job.finished_at else None
+    return {
+        'description': job.description,
+        'kind': job.kind,
+        'skipped': job.skipped,
+        'command': job.cmd,
+        'volatile': job.volatile,
+        'artifacts': [os.path.basename(writer.path) for writer in job.artifacts if writer.bytes_written],
+        'queued_at': iso(job.queued_at),
+        'started_at': iso(job.started_at),
+        'launched_at': iso(job.launched_at),
+        'finished_at': iso(job.finished_at),
+        'queue_wait_s': round(job.started_at - job.queued_at, 3) if job.started_at else None,
+        'duration_s': round(duration, 3) if duration is not None else None,
+        'bytes_written': job.bytes_written,
+        'stderr_bytes': job.stderr_bytes,
+        'bytes_per_s': round(job.bytes_written / duration) if duration else None,
+        'exit_status': job.returncode,
+        'peak_child_rss_bytes': job.peak_rss,
+        'indexed_rows': job.indexed_rows,
+        'error': job.error,
+    }
+
+
+def run_metrics(engine, jobs, started_at, finished_at):
+    written = sum(job.bytes_written + job.stderr_bytes for job in jobs)
+    duration = finished_at - started_at
+    return {
+        'started_at': iso(started_at),
+        'finished_at': iso(finished_at),
+        'duration_s': round(duration, 3),
+        'max_workers': engine.max_workers,
+        'backend': engine.backend.name,
+        'options': engine.options,
+        'bytes_written': written,
+        'bytes_per_s': round(written / duration) if duration else None,
+        'output': engine.medium.metrics(since=engine.output_since),
+        'volatile_snapshot': engine.snapshot,
+        'jobs': [job_metrics(job) for job in jobs],
+    }
+
+
+def snapshot_metrics(jobs):
+    # how far apart the volatile commands ran: the spread of their launch and
+    # finish times and the window from the first launch to the last finish
+    ran = [job for job in jobs if job.launched_at and job.finished_at]
+    if not ran:
+        return {'commands': 0}
+    launched = [job.launched_at for job in ran]
+    finished = [job.finished_at for job in ran]
+    return {
+        'commands': len(ran),
+        'launch_skew_s': round(max(launched) - min(launched), 6),
+        'finish_skew_s': round(max(finished) - min(finished), 6),
+        'window_s': round(max(finished) - min(launched), 6),
+        'jobs': [{'description': job.description,
+                  'command': job.cmd,
+                  'artifact': job.stored_file,
+                  'launched_at': datetime.fromtimestamp(job.launched_at).isoformat(timespec='microseconds'),
+                  'finished_at': datetime.fromtimestamp(job.finished_at).isoformat(timespec='microseconds'),
+                  'duration_s': round(job.finished_at - job.launched_at, 6),
+                  'exit_status': job.returncode,
+                  'error': job.error}
+                 for job in sorted(ran, key=lambda job: job.launched_at)],
+    }
+
+
+def append_run(output_path, run):
+    # one report per volume, one entry per engine run
+    path = os.path.join(output_path, RUN_REPORT)
+    with _save_lock:
+        try:
+            with open(path) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            report = {'runs': []}
+        report.setdefault('runs', []).append(run)
+        write_atomic(path, lambda f: json.dump(report, f, indent=2, default=str))
+    return path
+
+
+def format_rate(size, seconds):
+    rate = size / seconds / MB if seconds else 0.0
+    return f"{size / MB:.1f} MB in {seconds:.1f}s, {rate:.1f} MB/s"
@@ -0,0 +1,271 @@
+import collections
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from liveresponse.archive import DEFAULT_THREADS, ArchiveStats, SavePoints, expand_patterns, index_line
+from liveresponse.baseline import delta_status, removed_entry, same_metadata
+from liveresponse.governor import IOPOL_SCOPE_THREAD, set_io_policy
+from liveresponse.output import CHUNK_SIZE, MB, ArtifactWriter, sibling_path
+from liveresponse.walker import walk
+
+
+# Content-addressed acquisition: every unique file content is stored once as
+# objects/<2 hex>/<rest of sha256>, the acquisition itself is an NDJSON index
+# of path → metadata + sha256. Objects are never rewritten, so repeated and
+# overlapping acquisitions only add content the store does not have yet.
+
+STORE_DIR = "objects"
+STORE_FORMAT = 'store'
+STORE_EXTENSION = '.index.ndjson'
+# files up to this size are read once into memory, larger ones are hashed
+# first and only copied when the store does not have them
+INLINE_SIZE = 8 * 1024 * 1024
+
+
+class StoreStats(ArchiveStats):
+    def __init__(self):
+        super().__init__()
+        self.duplicates = 0
+
+    def state(self):
+        return dict(super().state(), duplicates=self.duplicates)
+
+    def restore(self, state):
+        super().restore(state)
+        self.duplicates = state['duplicates']
+
+    def summary(self):
+        return (f"{self.files} files, {self.bytes_in / MB:.1f} MB read, {self.bytes_out / MB:.1f} MB new "
+                f"in store, {self.duplicates} already stored{self.changed_summary()}{self.delta_summary()}"
+                f"{self.filter_summary()}, "
+                f"in {self.elapsed:.1f}s, {self.rate():.1f} MB/s")
+
+
+class ContentStore:
+    def __init__(self, root, throttle=None, medium=None):
+        self.root = root
+        self.tmp = os.path.join(root, 'tmp')
+        self.throttle = throttle
+        # objects are mostly small files, staged and written whole through the engine's OutputMedium
+        self.medium = medium
+        os.makedirs(self.tmp, exist_ok=True)
+        self._claimed = set()
+        self._lock = threading.Lock()
+
+    def object_path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def _claim(self, digest):
+        # True if the caller has to write the object
+        with self._lock:
+            if digest in self._claimed:
+                return False
+            self._claimed.add(digest)
+        if os.path.exists(self.object_path(digest)):
+            return False
+        return True
+
+    def _release(self, digest):
+        with self._lock:
+            self._claimed.discard(digest)
+
+    def _write(self, chunks):
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp)
+        os.close(fd)
+        hasher = hashlib.sha256()
+        try:
+            with ArtifactWriter(tmp_path, throttle=self.throttle, medium=self.medium) as writer:
+                for chunk in chunks:
+                    hasher.update(chunk)
+                    writer.write(chunk)
+            digest = hasher.hexdigest()
+            os.chmod(tmp_path, 0o444)
+            os.makedirs(os.path.dirname(self.object_path(digest)), exist_ok=True)
+            os.replace(tmp_path, self.object_path(digest))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self._claimed.add(digest)
+        return digest, writer.bytes_written
+
+    def put(self, f):
+        # returns (sha256, bytes added to the store, bytes read)
+        data = f.read(INLINE_SIZE + 1)
+        if len(data) <= INLINE_SIZE:
+            digest = hashlib.sha256(data).hexdigest()
+            if not self._claim(digest):
+                return digest, 0, len(data)
+            try:
+                return self._write([data]) + (len(data),)
+            except BaseException:
+                self._release(digest)
+                raise
+
+        hasher = hashlib.sha256(data)
+        size = len(data)
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+            size += len(chunk)
+        digest = hasher.hexdigest()
+        if not self._claim(digest):
+            return digest, 0, size
+        f.seek(0)
+        try:
+            # the file may have changed since it was hashed, the object is
+            # named after the bytes actually copied
+            stored_digest, stored = self._write(iter(lambda: f.read(CHUNK_SIZE), b''))
+        except BaseException:
+            self._release(digest)
+            raise
+        if stored_digest != digest:
+            self._release(digest)
+        return stored_digest, stored, stored
+
+
+class _SourceError(Exception):
+    def __init__(self, error):
+        super().__init__(str(error))
+        self.error = error
+
+
+class _Source:
+    # the file being stored; its read errors are told apart from those of the store
+    def __init__(self, f):
+        self.f = f
+
+    def read(self, size):
+        try:
+            return self.f.read(size)
+        except OSError as e:
+            raise _SourceError(e) from e
+
+    def seek(self, offset):
+        try:
+            return self.f.seek(offset)
+        except OSError as e:
+            raise _SourceError(e) from e
+
+
+def store_path(store, entry, base=None):
+    # stores the content of a walked entry; returns (index entry, bytes added
+    # to the store, bytes read), bytes read is None when the metadata matches
+    # the baseline entry and the file was not opened
+    if 'error' in entry:
+        return entry, 0, 0
+    path = entry['path']
+    if same_metadata(entry, base) and (entry['type'] != 'file' or 'sha256' in base and
+                                       os.path.exists(store.object_path(base['sha256']))):
+        if 'sha256' in base:
+            entry['sha256'] = base['sha256']
+        return entry, 0, None
+    if entry['type'] != 'file':
+        return entry, 0, 0
+    # only errors of the source file are recorded in its entry, errors
+    # writing the store propagate and stop the acquisition
+    try:
+        f = open(path, 'rb')
+    except OSError as e:
+        return {'path': path, 'error': e.strerror or str(e)}, 0, 0
+    try:
+        with f:
+            digest, stored, read = store.put(_Source(f))
+    except _SourceError as e:
+        return {'path': path, 'error': e.error.strerror or str(e.error)}, 0, 0
+    entry['sha256'] = digest
+    if read != entry['size']:
+        entry['size_read'] = read
+    return entry, stored, read
+
+
+def create_store_acquisition(spec, writer, store, threads=DEFAULT_THREADS, io_policy=None, map_path=None,
+                             resume=None, checkpoint=None, baseline=None, walk_filter=None):
+    # with a baseline (a Lookahead over the previous index) only new and
+    # changed entries are written to the index
+    stats = StoreStats()
+    pending = collections.deque()
+    if resume:
+        stats.restore(resume)
+    done = resume['entries'] if resume else 0
+
+    def save(path):
+        # objects are only renamed into place, make sure they reached the stick
+        os.sync()
+        writer.sync()
+        checkpoint(offset=writer.bytes_written, entries=done, path=path, **stats.state())
+
+    save_point = SavePoints(save, lambda: stats.bytes_out) if checkpoint else None
+
+    def finish_one():
+        nonlocal done
+        future, base, passed = pending.popleft()
+        entry, stored, read = future.result()
+        for old_path, _ in passed:
+            stats.removed += 1
+            writer.write(index_line(removed_entry(old_path)))
+        if read is None:
+            stats.unchanged += 1
+        else:
+            if 'error' in entry:
+                stats.errors.append(f"{entry['path']}: {entry['error']}")
+            elif entry['type'] == 'file':
+                stats.files += 1
+                stats.bytes_in += read
+                stats.bytes_out += stored
+                stats.duplicates += not stored
+                stats.changed += 'size_read' in entry
+            if baseline and 'error' not in entry:
+                entry['status'] = delta_status(entry, base)
+            writer.write(index_line(entry))
+        done += 1
+        if save_point:
+            save_point(entry['path'])
+
+    with ThreadPoolExecutor(max_workers=max(1, threads), initializer=set_io_policy,
+                            initargs=(io_policy, IOPOL_SCOPE_THREAD)) as pool:
+        try:
+            # results are written in walk order, at most a few files ahead
+            for entries, entry in enumerate(walk(expand_patterns(spec, map_path), stats, walk_filter,
+                                                 io_policy=io_policy), 1):
+                base, passed = baseline.take(entry['path']) if baseline else (None, [])
+                if entries <= done:
+                    continue
+                pending.append((pool.submit(store_path, store, entry, base), base, passed))
+                while len(pending) > threads * 4:
+                    finish_one()
+            while pending:
+                finish_one()
+            if baseline:
+                for old_path, _ in baseline.rest():
+                    stats.removed += 1
+                    writer.write(index_line(removed_entry(old_path)))
+        finally:
+            for future, _, _ in pending:
+                future.cancel()
+            stats.finish()
+    return stats
+
+
+def acquire_store(engine, spec, output_file, threads=DEFAULT_THREADS, resume=None, baseline=None, walk_filter=None):
+    # baseline: (manifest entry, Lookahead) of the previous full index, see baseline.py
+    base_entry, lookahead = baseline or (None, None)
+
+    def checkpoint(**state):
+        engine.checkpoint(artifact=output_file, baseline=base_entry and base_entry['name'],
+                          filters=walk_filter.rules() if walk_filter else None, **state)
+
+    store = ContentStore(os.path.join(engine.output_path, STORE_DIR), throttle=engine.governor, medium=engine.medium)
+    with engine.open_artifact(output_file, resume_at=resume['offset'] if resume else None) as writer:
+        if not resume:
+            checkpoint(offset=0, entries=0, path=None, **StoreStats().state())
+        stats = create_store_acquisition(spec, writer, store, threads=threads,
+                                         io_policy=engine.governor.io_policy, map_path=engine.backend.path,
+                                         resume=resume, checkpoint=checkpoint, baseline=lookahead,
+                                         walk_filter=walk_filter)
+    if stats.errors:
+        with engine.open_artifact(sibling_path(output_file, 'stderr')) as writer:
+            writer.write(''.join(f"{error}\n" for error in stats.errors).encode())
+    return stats
@@ -0,0 +1,119 @@
+import asyncio
+import base64
+import contextlib
+import json
+import plistlib
+from datetime import datetime
+
+from liveresponse.output import sibling_path
+
+
+# system_profiler one data type at a time: the types are listed once, run
+# with -xml on a bounded number of concurrent children and the plists merged
+# into a single JSON artifact in list order. A plain `system_profiler` runs
+# every type one after the other and spends most of its minutes in a few
+# types that scan the disk.
+
+DETAIL_LEVELS = ('mini', 'basic', 'full')
+DEFAULT_DETAIL = 'full'
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TYPE_TIMEOUT = 300
+# types that walk the file system or query services; skipped by quick profiles
+SLOW_TYPES = frozenset({
+    'SPApplicationsDataType',
+    'SPDeveloperToolsDataType',
+    'SPDisabledSoftwareDataType',
+    'SPExtensionsDataType',
+    'SPFontsDataType',
+    'SPFrameworksDataType',
+    'SPInstallHistoryDataType',
+    'SPLegacySoftwareDataType',
+    'SPLogsDataType',
+    'SPManagedClientDataType',
+    'SPPrefPaneDataType',
+    'SPPrintersSoftwareDataType',
+    'SPRawCameraDataType',
+    'SPStartupItemDataType',
+    'SPSyncServicesDataType',
+})
+
+
+class _Buffer:
+    def __init__(self):
+        self.chunks = []
+        self.bytes_written = 0
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.bytes_written += len(data)
+
+    def getvalue(self):
+        return b''.join(self.chunks)
+
+
+def _json_value(value):
+    # plist types without a JSON counterpart
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    if isinstance(value, plistlib.UID):
+        return value.data
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def data_types(engine, stderr, binary='system_profiler'):
+    out = _Buffer()
+    await engine.spawn([binary, '-listDataTypes'], out, stderr, shell=False)
+    names = (line.strip() for line in out.getvalue().decode(errors='replace').splitlines())
+    return [name for name in names if name.startswith('SP')]
+
+
+async def collect(engine, output_file, detail=DEFAULT_DETAIL, skip_slow=False, concurrency=DEFAULT_CONCURRENCY,
+                  timeout=DEFAULT_TYPE_TIMEOUT, binary='system_profiler', compression=None):
+    # returns (data types collected, skipped types, {type: error}, bytes written)
+    writer = engine.open_artifact(output_file, compression=compression)
+    stderr = engine.open_artifact(sibling_path(output_file, 'stderr'), lazy=True)
+    limit = asyncio.Semaphore(max(1, concurrency))
+    errors = {}
+
+    async def profile(name):
+        async with limit:
+            out, err = _Buffer(), _Buffer()
+            try:
+                returncode = await engine.spawn([binary, '-xml', '-detailLevel', detail, name], out, err,
+                                                shell=False, timeout=timeout)
+                data = plistlib.loads(out.getvalue()) if out.bytes_written else None
+                if returncode:
+                    errors[name] = f"exit status {returncode}"
+            except Exception as e:
+                errors[name] = str(e)
+                data = None
+            if err.bytes_written:
+                stderr.write(f"--- {name} ---\n".encode() + err.getvalue())
+            return data
+
+    tasks = []
+    try:
+        names = await data_types(engine, stderr, binary)
+        skipped = [name for name in names if skip_slow and name in SLOW_TYPES]
+        names = [name for name in names if name not in skipped]
+        tasks = [asyncio.ensure_future(profile(name)) for name in names]
+        writer.write(f'{{"detail_level": {json.dumps(detail)}, "data_types": {{'.encode())
+        # written in list order as the results come in, so only the types that
+        # finished ahead of an earlier one are held in memory
+        for index, (name, task) in enumerate(zip(names, tasks)):
+            data = await task
+            tasks[index] = None
+            writer.write(f'{", " if index else ""}{json.dumps(name)}: '.encode() +
+                         json.dumps(data, default=_json_value).encode())
+        writer.write(f'}}, "skipped": {json.dumps(skipped)}, "errors": {json.dumps(errors)}}}\n'.encode())
+    finally:
+        pending = [task for task in tasks if task is not None]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        with contextlib.ExitStack() as stack:
+            stack.callback(stderr.close)
+            writer.close()
+    return names, skipped, errors, writer.bytes_written
@@ -0,0 +1,112 @@
+import asyncio
+import contextlib
+import tempfile
+from datetime import datetime, timedelta
+
+from liveresponse.output import CHUNK_SIZE, sibling_path
+
+
+DEFAULT_SLICES = 4
+DEFAULT_WINDOW = timedelta(hours=24)
+STYLES = ('default', 'compact', 'json', 'ndjson', 'syslog')
+# --style json prints one array per invocation, slices would not concatenate
+UNSLICED_STYLES = ('json',)
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# slices beyond the first are spooled in memory up to this size, then on the output volume
+SPOOL_LIMIT = 64 * 1024 * 1024
+
+
+def time_slices(start, end, count):
+    count = max(1, int(count))
+    seconds = max(1, int((end - start).total_seconds()))
+    count = min(count, seconds)
+    bounds = [start + timedelta(seconds=seconds * i // count) for i in range(count + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def log_show_args(start, end, style=None, predicate=None, log_binary='log'):
+    args = [log_binary, 'show', '--start', start.strftime(TIME_FORMAT), '--end', end.strftime(TIME_FORMAT)]
+    if style and style != 'default':
+        args += ['--style', style]
+    if predicate:
+        args += ['--predicate', predicate]
+    return args
+
+
+class _SliceSpool:
+    def __init__(self, directory, drop_header):
+        self.file = tempfile.SpooledTemporaryFile(max_size=SPOOL_LIMIT, dir=directory,
+                                                  prefix='.unified_log_slice_')
+        self.drop_header = drop_header
+        self.bytes_written = 0
+
+    def write(self, data):
+        if self.drop_header:
+            # every slice repeats the column header of the default/compact styles
+            newline = data.find(b'\n')
+            if self.bytes_written == 0 and data.startswith(b'Timestamp') and newline >= 0:
+                data = data[newline + 1:]
+            self.drop_header = False
+        self.file.write(data)
+        self.bytes_written += len(data)
+
+
+class _Labelled:
+    def __init__(self, writer, label):
+        self.writer = writer
+        self.label = label
+        self.bytes_written = 0
+
+    def write(self, data):
+        self.writer.write(f"--- {self.label} ---\n".encode() + data if not self.bytes_written else data)
+        self.bytes_written += len(data)
+
+
+async def extract(engine, output_file, start=None, end=None, window=DEFAULT_WINDOW,
+                  slices=DEFAULT_SLICES, style=None, predicate=None, log_binary='log', compression=None):
+    end = end or datetime.now().replace(microsecond=0)
+    start = start or end - window
+    ranges = time_slices(start, end, 1 if style in UNSLICED_STYLES else slices)
+    loop = asyncio.get_running_loop()
+    # the job's own worker slot; further slices run in parallel only while
+    # the engine has free slots, so they count against its limit
+    own_slot = asyncio.Semaphore(1)
+
+    async def show(slice_start, slice_end, spool):
+        args = log_show_args(slice_start, slice_end, style, predicate, log_binary)
+        label = _Labelled(stderr, f"{slice_start} - {slice_end}")
+        if engine.try_acquire_slot():
+            try:
+                return await engine.spawn(args, spool, label, shell=False)
+            finally:
+                await engine.release_slot()
+        async with own_slot:
+            return await engine.spawn(args, spool, label, shell=False)
+
+    writer = engine.open_artifact(output_file, compression=compression)
+    stderr = engine.open_artifact(sibling_path(output_file, 'stderr'), lazy=True)
+    header_styles = (None, 'default', 'compact')
+    spools = [writer] + [_SliceSpool(engine.output_path, style in header_styles) for _ in ranges[1:]]
+    try:
+        # the first slice streams straight into the artifact, later ones are
+        # spooled and appended in order once every slice has finished
+        returncodes = await asyncio.gather(*[show(slice_start, slice_end, spool)
+                                             for (slice_start, slice_end), spool in zip(ranges, spools)])
+
+        def stitch():
+            for spool in spools[1:]:
+                spool.file.seek(0)
+                while True:
+                    chunk = spool.file.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    writer.write(chunk)
+
+        await loop.run_in_executor(None, stitch)
+    finally:
+        with contextlib.ExitStack() as stack:
+            stack.callback(stderr.close)
+            stack.callback(writer.close)
+            for spool in spools[1:]:
+                stack.callback(spool.file.close)
+    return ranges, returncodes, writer.bytes_written
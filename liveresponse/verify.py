@@ -0,0 +1,197 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from liveresponse.manifest import CHECKSUMS_TXT, artifact_names, load_entries
+from liveresponse.merkle import PARALLEL_CHUNKS, check_tree, chunk_count, new_pool, submit_chunks
+from liveresponse.output import MB, open_stored
+
+
+# Analyst-side check of a collection against its manifest. Nothing is written
+# to the volume. Files are hashed concurrently (hashlib releases the GIL);
+# artifacts with a hash tree (see merkle.py) are also verified chunk by chunk
+# on a process pool, which tells which region of a bad copy differs, and the
+# recorded root is checked against the leaves.
+
+READ_SIZE = 8 * 1024 * 1024
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+
+class VerifyResult:
+    def __init__(self):
+        self.verified = []
+        self.mismatched = []
+        self.missing = []
+        self.extra = []
+        self.bytes_read = 0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ok(self):
+        return not (self.mismatched or self.missing)
+
+    def add_bytes(self, size):
+        with self._lock:
+            self.bytes_read += size
+
+    def rate(self):
+        return self.bytes_read / self.elapsed / MB if self.elapsed else 0.0
+
+    def summary(self):
+        return (f"{len(self.verified)} verified, {len(self.mismatched)} mismatched, {len(self.missing)} missing, "
+                f"{len(self.extra)} not in manifest; {self.bytes_read / MB:.1f} MB in {self.elapsed:.1f}s, "
+                f"{self.rate():.1f} MB/s")
+
+
+def load_expected(output_path):
+    # manifest entries, or checksums.txt of a volume without manifest.json
+    entries = load_entries(output_path)
+    if entries:
+        return entries
+    try:
+        with open(os.path.join(output_path, CHECKSUMS_TXT)) as f:
+            for line in f:
+                digest, _, name = line.rstrip("\n").partition("  ")
+                if name:
+                    entries[name] = {'name': name, 'digests': {'sha256': digest}}
+    except OSError:
+        pass
+    return entries
+
+
+def hash_digests(path, algorithms, result):
+    hashers = [hashlib.new(name) for name in algorithms]
+    buffer = bytearray(READ_SIZE)
+    view = memoryview(buffer)
+    size = 0
+    with open(path, 'rb', buffering=0) as f:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        while True:
+            count = f.readinto(buffer)
+            if not count:
+                break
+            for hasher in hashers:
+                hasher.update(view[:count])
+            size += count
+            result.add_bytes(count)
+    return size, {name: hasher.hexdigest() for name, hasher in zip(algorithms, hashers)}
+
+
+def hash_content(path, algorithms):
+    # digests of what a compressed artifact expands to
+    hashers = [hashlib.new(name) for name in algorithms]
+    size = 0
+    with open_stored(path) as f:
+        while True:
+            chunk = f.read(READ_SIZE)
+            if not chunk:
+                break
+            for hasher in hashers:
+                hasher.update(chunk)
+            size += len(chunk)
+    return size, {name: hasher.hexdigest() for name, hasher in zip(algorithms, hashers)}
+
+
+def _check_digests(output_path, entry, result):
+    path = os.path.join(output_path, entry['name'])
+    size, digests = hash_digests(path, list(entry['digests']), result)
+    if 'size' in entry and size != entry['size']:
+        return f"size {size} != {entry['size']}"
+    bad = [name for name, digest in entry['digests'].items() if digests[name] != digest]
+    if bad:
+        return f"{', '.join(bad)} mismatch"
+    return _check_content(path, entry)
+
+
+def _check_content(path, entry):
+    content = entry.get('content')
+    if not content:
+        return None
+    try:
+        size, digests = hash_content(path, list(content['digests']))
+    except Exception as e:
+        # gzip, zlib and zstandard each raise their own errors for a damaged stream
+        return f"does not decompress: {e}"
+    if size != content['size']:
+        return f"uncompressed size {size} != {content['size']}"
+    bad = [name for name, digest in content['digests'].items() if digests[name] != digest]
+    return f"uncompressed {', '.join(bad)} mismatch" if bad else None
+
+
+def _chunk_ranges(tree, bad):
+    size = tree['chunk_size']
+    return ', '.join(f"bytes {index * size}-{(index + 1) * size - 1}" for index in bad[:5]) + \
+        (f" and {len(bad) - 5} more chunks" if len(bad) > 5 else "")
+
+
+def verify_collection(output_path, workers=DEFAULT_WORKERS, chunks=True, log=print):
+    result = VerifyResult()
+    started = time.monotonic()
+    expected = load_expected(output_path)
+    result.extra = [name for name in artifact_names(output_path) if name not in expected]
+
+    plain, trees = [], []
+    for name, entry in sorted(expected.items()):
+        path = os.path.join(output_path, name)
+        if not os.path.isfile(path):
+            result.missing.append(name)
+            log(f"✗ {name}: missing")
+            continue
+        tree = entry.get('chunks')
+        size = os.path.getsize(path)
+        if chunks and tree and size == entry.get('size') and \
+                chunk_count(size, tree['chunk_size']) >= PARALLEL_CHUNKS:
+            trees.append((entry, size))
+        else:
+            plain.append(entry)
+
+    def report(entry, problem):
+        if problem:
+            result.mismatched.append((entry['name'], problem))
+            log(f"✗ {entry['name']}: {problem}")
+        else:
+            result.verified.append(entry['name'])
+
+    pool = new_pool(workers) if trees else None
+    try:
+        # chunks of the large artifacts are queued first so the process pool
+        # stays busy while the threads work through the small ones
+        tree_futures = [(entry, size, submit_chunks(pool, os.path.join(output_path, entry['name']), size,
+                                                     entry['chunks']['chunk_size'], workers))
+                        for entry, size in trees]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as threads:
+            futures = [(entry, threads.submit(_check_digests, output_path, entry, result)) for entry in plain]
+            # the plain digests of the large artifacts are what checksums.txt
+            # holds, they are checked as well as the chunks
+            tree_digests = [threads.submit(_check_digests, output_path, entry, result) for entry, _ in trees]
+            for entry, future in futures:
+                try:
+                    report(entry, future.result())
+                except OSError as e:
+                    report(entry, e.strerror or str(e))
+            for (entry, size, futures), digests in zip(tree_futures, tree_digests):
+                tree = entry['chunks']
+                try:
+                    leaves = [leaf for future in futures for leaf in future.result()]
+                    problem = digests.result()
+                except OSError as e:
+                    report(entry, e.strerror or str(e))
+                    continue
+                result.add_bytes(size)
+                bad, root_matches = check_tree(leaves, tree)
+                if bad:
+                    problem = f"chunk mismatch at {_chunk_ranges(tree, bad)}"
+                elif not root_matches:
+                    problem = "chunk tree root mismatch"
+                report(entry, problem)
+    finally:
+        if pool:
+            pool.shutdown()
+    for name in result.extra:
+        log(f"⚠ {name}: not in manifest")
+    result.elapsed = time.monotonic() - started
+    return result
@@ -0,0 +1,116 @@
+import os
+import plistlib
+import re
+import subprocess
+import sys
+import threading
+import time
+
+
+VOLUMES_DIR = '/Volumes'
+SYSTEM_VOLUMES = {'Macintosh HD'}
+# points discovery at a recorded `diskutil list -plist` output
+FIXTURE_ENV = 'LIVERESPONSE_DISKUTIL_PLIST'
+
+
+class Volume:
+    def __init__(self, name, mount_point, device_id=None, physical_disk=None):
+        self.name = name
+        self.mount_point = mount_point
+        self.device_id = device_id
+        self.physical_disk = physical_disk or 'unknown'
+
+    def __repr__(self):
+        return f"Volume({self.name!r}, {self.device_id!r}, {self.physical_disk!r})"
+
+
+def whole_disk(device_id):
+    return re.sub(r's\d+$', '', device_id)
+
+
+def parse_diskutil_list(data):
+    # maps mount point → (device identifier, physical whole disk)
+    plist = plistlib.loads(data)
+    mounts = {}
+    for disk in plist.get('AllDisksAndPartitions', []):
+        disk_id = disk.get('DeviceIdentifier', '')
+        stores = [store.get('DeviceIdentifier', '') for store in disk.get('APFSPhysicalStores', [])]
+        physical = whole_disk(stores[0]) if stores and stores[0] else disk_id
+
+        if disk.get('MountPoint'):
+            mounts[disk['MountPoint']] = (disk_id, physical)
+        for volume in disk.get('Partitions', []) + disk.get('APFSVolumes', []):
+            mount_point = volume.get('MountPoint')
+            if mount_point:
+                mounts[mount_point] = (volume.get('DeviceIdentifier'), physical)
+    return mounts
+
+
+class VolumeDiscovery:
+    def __init__(self, volumes_dir=VOLUMES_DIR, plist_path=None, exclude=SYSTEM_VOLUMES):
+        self.volumes_dir = volumes_dir
+        self.plist_path = plist_path or os.environ.get(FIXTURE_ENV)
+        self.exclude = set(exclude)
+        self._lock = threading.Lock()
+        self._key = None
+        self._volumes = []
+
+    def _diskutil_plist(self):
+        if self.plist_path:
+            with open(self.plist_path, 'rb') as f:
+                return f.read()
+        result = subprocess.run(['diskutil', 'list', '-plist'], capture_output=True, check=True)
+        return result.stdout
+
+    def _cache_key(self):
+        try:
+            return os.stat(self.volumes_dir).st_mtime_ns, tuple(sorted(os.listdir(self.volumes_dir)))
+        except OSError:
+            return None
+
+    def scan(self, force=False):
+        with self._lock:
+            key = self._cache_key()
+            if not force and key is not None and key == self._key:
+                return list(self._volumes)
+
+            mounts = parse_diskutil_list(self._diskutil_plist())
+            if key is not None:
+                names = key[1]
+            else:
+                # no /Volumes (e.g. replaying a fixture on Linux)
+                prefix = self.volumes_dir.rstrip('/') + '/'
+                names = sorted(mp[len(prefix):] for mp in mounts if mp.startswith(prefix))
+
+            volumes = []
+            for name in names:
+                if not name or name in self.exclude or name.startswith('.'):
+                    continue
+                mount_point = os.path.join(self.volumes_dir, name)
+                device_id, physical = mounts.get(mount_point, (None, None))
+                volumes.append(Volume(name, mount_point, device_id, physical))
+
+            self._key = key
+            self._volumes = volumes
+            return list(volumes)
+
+
+def main(argv):
+    if not argv or argv[0] in ('-h', '--help'):
+        print(f"usage: {sys.executable} -m liveresponse.volumes diskutil_list.plist [repeat]", file=sys.stderr)
+        return 2
+    repeat = int(argv[1]) if len(argv) > 1 else 1
+    discovery = VolumeDiscovery(plist_path=argv[0])
+    started = time.perf_counter()
+    for _ in range(repeat):
+        volumes = discovery.scan(force=True)
+    elapsed = time.perf_counter() - started
+    for volume in volumes:
+        print(f"{volume.name}\t{volume.device_id}\t{volume.physical_disk}")
+    print(f"{repeat} parse(s) in {elapsed * 1000:.2f} ms ({elapsed / repeat * 1e6:.1f} µs each)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,264 @@
+import base64
+import ctypes
+import fnmatch
+import os
+import stat
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from liveresponse.governor import IOPOL_SCOPE_THREAD, libc, set_io_policy
+from liveresponse.output import MB
+
+
+# File tree enumeration for logical acquisitions. Directories are listed with
+# os.scandir on a thread pool, a bounded number of directories ahead of the
+# archiver, and every entry is lstat'ed and its extended attributes read in
+# the same pass. Entries still come out in the order of a sorted os.walk
+# (a directory's listing, then each subdirectory in turn), which resume
+# offsets and baseline indexes rely on. Filters are applied while listing,
+# so pruned directories are never entered and skipped files never opened.
+
+DEFAULT_WALK_THREADS = 8
+# directories listed ahead of the one being archived, per thread
+PREFETCH_PER_THREAD = 8
+# values above this are recorded as null (resource forks and the like)
+XATTR_VALUE_LIMIT = 64 * 1024
+# directory names pruned by skip_caches
+CACHE_DIRS = frozenset({
+    'Caches', 'Cache', 'cache', '.cache', 'Code Cache', 'GPUCache', 'GrShaderCache', 'ShaderCache',
+    'CacheStorage', 'ScriptCache', 'DawnCache', 'com.apple.metal',
+})
+
+# macOS <sys/xattr.h>
+XATTR_NOFOLLOW = 1
+
+
+class WalkFilter:
+    # which entries an acquisition takes. Size, time and extension rules apply
+    # to everything but directories, which are kept so the tree structure is
+    # recorded; directories are only pruned by name (caches, exclude patterns).
+    def __init__(self, max_size=None, newer=None, older=None, extensions=(), exclude=(), skip_caches=False):
+        self.max_size = max_size
+        # mtime window, seconds since the epoch
+        self.newer = newer
+        self.older = older
+        self.extensions = tuple(sorted({('' if ext.startswith('.') else '.') + ext.lower()
+                                        for ext in extensions if ext}))
+        self.exclude = tuple(exclude)
+        self.skip_caches = skip_caches
+
+    def __bool__(self):
+        return bool(self.max_size is not None or self.newer is not None or self.older is not None or
+                    self.extensions or self.exclude or self.skip_caches)
+
+    def prune(self, name):
+        return self.skip_caches and name in CACHE_DIRS or self._excluded(name)
+
+    def wants(self, name, st):
+        if self._excluded(name):
+            return False
+        if self.extensions and not name.lower().endswith(self.extensions):
+            return False
+        if self.max_size is not None and stat.S_ISREG(st.st_mode) and st.st_size > self.max_size:
+            return False
+        if self.newer is not None and st.st_mtime < self.newer:
+            return False
+        return self.older is None or st.st_mtime < self.older
+
+    def _excluded(self, name):
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.exclude)
+
+    def rules(self):
+        # journal form, an interrupted acquisition resumes with the same rules
+        return {'max_size': self.max_size, 'newer': self.newer, 'older': self.older,
+                'extensions': list(self.extensions), 'exclude': list(self.exclude), 'skip_caches': self.skip_caches}
+
+    @classmethod
+    def from_rules(cls, rules):
+        return cls(**rules) if rules else None
+
+    def summary(self):
+        parts = []
+        if self.max_size is not None:
+            parts.append(f"files up to {self.max_size / MB:.4g} MB")
+        if self.newer is not None:
+            parts.append(f"modified since {_date(self.newer)}")
+        if self.older is not None:
+            parts.append(f"modified before {_date(self.older)}")
+        if self.extensions:
+            parts.append(' '.join(self.extensions))
+        if self.exclude:
+            parts.append(f"excluding {' '.join(self.exclude)}")
+        if self.skip_caches:
+            parts.append("caches skipped")
+        return ', '.join(parts)
+
+
+def _date(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat(sep=' ', timespec='minutes')
+
+
+def parse_time(value):
+    # a number of days before now, or an ISO date / date and time
+    try:
+        return time.time() - float(value) * 86400
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _xattr_functions():
+    c = libc()
+    if c.listxattr.restype is not ctypes.c_ssize_t:
+        c.listxattr.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_size_t, ctypes.c_int]
+        c.getxattr.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_void_p, ctypes.c_size_t,
+                               ctypes.c_uint32, ctypes.c_int]
+        c.listxattr.restype = c.getxattr.restype = ctypes.c_ssize_t
+    return c
+
+
+def _darwin_xattrs(path):
+    libc = _xattr_functions()
+    encoded = os.fsencode(path)
+    size = libc.listxattr(encoded, None, 0, XATTR_NOFOLLOW)
+    if size <= 0:
+        return {}
+    names = ctypes.create_string_buffer(size)
+    size = libc.listxattr(encoded, names, size, XATTR_NOFOLLOW)
+    values = {}
+    for name in names.raw[:max(size, 0)].split(b'\0'):
+        if not name:
+            continue
+        length = libc.getxattr(encoded, name, None, 0, 0, XATTR_NOFOLLOW)
+        if length < 0:
+            continue
+        value = None
+        if length <= XATTR_VALUE_LIMIT:
+            buffer = ctypes.create_string_buffer(max(length, 1))
+            length = libc.getxattr(encoded, name, buffer, length, 0, XATTR_NOFOLLOW)
+            value = buffer.raw[:length] if length >= 0 else None
+        values[os.fsdecode(name)] = value
+    return values
+
+
+def _linux_xattrs(path):
+    values = {}
+    for name in os.listxattr(path, follow_symlinks=False):
+        try:
+            value = os.getxattr(path, name, follow_symlinks=False)
+        except OSError:
+            continue
+        values[name] = value if len(value) <= XATTR_VALUE_LIMIT else None
+    return values
+
+
+def read_xattrs(path):
+    # {name: base64 value}; unreadable attributes are left out
+    try:
+        if sys.platform == 'darwin':
+            values = _darwin_xattrs(path)
+        elif hasattr(os, 'listxattr'):
+            values = _linux_xattrs(path)
+        else:
+            return {}
+    except (OSError, AttributeError):
+        return {}
+    return {name: base64.b64encode(value).decode() if value is not None else None
+            for name, value in sorted(values.items())}
+
+
+def describe(path, st, xattrs=None):
+    entry = {'path': path, 'mode': oct(stat.S_IMODE(st.st_mode)), 'uid': st.st_uid, 'gid': st.st_gid,
+             'size': st.st_size, 'mtime': st.st_mtime, 'ctime': st.st_ctime, 'atime': st.st_atime,
+             'ino': st.st_ino, 'dev': st.st_dev, 'nlink': st.st_nlink}
+    if hasattr(st, 'st_birthtime'):
+        entry['birthtime'] = st.st_birthtime
+    if getattr(st, 'st_flags', 0):
+        entry['flags'] = st.st_flags
+    if stat.S_ISREG(st.st_mode):
+        entry['type'] = 'file'
+    elif stat.S_ISDIR(st.st_mode):
+        entry['type'] = 'dir'
+    elif stat.S_ISLNK(st.st_mode):
+        entry['type'] = 'link'
+        entry['target'] = os.readlink(path)
+    else:
+        entry['type'] = 'other'
+    if xattrs:
+        entry['xattrs'] = xattrs
+    return entry
+
+
+def _entry(path, st=None):
+    try:
+        return describe(path, st or os.lstat(path), read_xattrs(path))
+    except OSError as e:
+        return {'path': path, 'error': e.strerror or str(e)}
+
+
+def _scan(path, walk_filter, root):
+    # runs on the pool: (entries in walk order, directories to descend into,
+    # errors, number of entries filtered out). A root is listed with its own
+    # entry first and only descended into if it is a real directory.
+    entries, errors = [], []
+    if root:
+        entry = _entry(path)
+        entries.append(entry)
+        if entry.get('type') != 'dir':
+            return entries, [], errors, 0
+    try:
+        with os.scandir(path) as it:
+            items = list(it)
+    except OSError as e:
+        errors.append(str(e))
+        return entries, [], errors, 0
+    dirs, files = [], []
+    for item in items:
+        # symlinks to directories sort with the directories, as in os.walk
+        try:
+            is_dir = item.is_dir()
+        except OSError:
+            is_dir = False
+        (dirs if is_dir else files).append(item)
+    filtered = 0
+    descend = []
+    for item in sorted(dirs, key=lambda item: item.name) + sorted(files, key=lambda item: item.name):
+        try:
+            st = item.stat(follow_symlinks=False)
+        except OSError as e:
+            entries.append({'path': item.path, 'error': e.strerror or str(e)})
+            continue
+        if stat.S_ISDIR(st.st_mode):
+            if walk_filter and walk_filter.prune(item.name):
+                filtered += 1
+                continue
+            descend.append(item.path)
+        elif walk_filter and not walk_filter.wants(item.name, st):
+            filtered += 1
+            continue
+        entries.append(_entry(item.path, st))
+    return entries, descend, errors, filtered
+
+
+def walk(paths, stats, walk_filter=None, threads=DEFAULT_WALK_THREADS, io_policy=None):
+    # yields the index entry of every path under paths (or {'path', 'error'});
+    # listing errors go to stats.errors, the number of entries left out by the
+    # filter to stats.filtered
+    pool = ThreadPoolExecutor(max_workers=max(1, threads), initializer=set_io_policy,
+                              initargs=(io_policy, IOPOL_SCOPE_THREAD))
+    # [path, root, future] of the directories still to be listed, next one last
+    stack = [[path, True, None] for path in reversed(paths)]
+    prefetch = max(1, threads) * PREFETCH_PER_THREAD
+    try:
+        while stack:
+            for item in stack[-prefetch:]:
+                if item[2] is None:
+                    item[2] = pool.submit(_scan, item[0], walk_filter, item[1])
+            entries, descend, errors, filtered = stack.pop()[2].result()
+            stats.errors.extend(errors)
+            stats.filtered += filtered
+            stack.extend([path, False, None] for path in reversed(descend))
+            yield from entries
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)